@@ -0,0 +1,83 @@
+"""Filled_Forms listing time before and after compaction.
+
+Run from the repository root:  python benchmarks/bench_compaction.py [--files 50000] [--mode zip|shard] [--dir DIR]
+
+Creates a flat directory of small, correctly named copies spread over many sessions in the past, times a full
+listing (os.scandir + sort, what Explorer/backup tools effectively do), compacts it and times the listing again.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from onboarding.compaction import ArchiveManifest, CompactionJob  # noqa: E402
+from onboarding.forms_core import copied_form_name  # noqa: E402
+
+FORMS = ("Enrollment.pdf", "Medical_Consent.pdf", "Emergency_Contacts.docx", "Allergy_Plan.doc", "Photo_Release.pdf")
+
+
+def populate(filled_dir, count):
+    start = datetime.now() - timedelta(days=400)
+    sessions = max(1, count // len(FORMS))
+    spacing = timedelta(days=365) / sessions
+    for i in range(count):
+        session = i // len(FORMS)
+        when = start + session * spacing
+        name = copied_form_name(FORMS[i % len(FORMS)], "Parent" if session % 4 else "Staff",
+                                f"Family {session:05d}", when)
+        with open(os.path.join(filled_dir, name), "wb") as f:
+            f.write(b"%PDF-1.4 synthetic\n" * 8)
+
+
+def time_listing(directory, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with os.scandir(directory) as entries:
+            names = sorted(entry.name for entry in entries)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, len(names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--mode", choices=("zip", "shard"), default="zip")
+    parser.add_argument("--dir", default=None, help="parent directory for the synthetic tree (default: temp dir)")
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="compaction-bench-", dir=args.dir)
+    try:
+        filled_dir = os.path.join(root, "Filled_Forms")
+        os.mkdir(filled_dir)
+        populate(filled_dir, args.files)
+
+        before_ms, before_entries = time_listing(filled_dir)
+        job = CompactionJob(filled_dir, mode=args.mode, min_age_days=1, yield_seconds=0)
+        start = time.perf_counter()
+        job.run()
+        compact_s = time.perf_counter() - start
+        after_ms, after_entries = time_listing(filled_dir)
+
+        manifest = ArchiveManifest(job.archive_dir)
+        start = time.perf_counter()
+        manifest.entries_for_user("Parent", "Family 00001")
+        lookup_ms = (time.perf_counter() - start) * 1000
+        manifest.close()
+
+        print(f"Listing before: {before_ms:8.1f} ms ({before_entries} entries)")
+        print(f"Compaction:     {compact_s:8.2f} s  ({job.archived} files, {args.mode})")
+        print(f"Listing after:  {after_ms:8.1f} ms ({after_entries} entries)")
+        print(f"Manifest lookup for one family: {lookup_ms:.2f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Bytes written and latency per form copy strategy.
+
+Run from the repository root:  python benchmarks/bench_copy_strategies.py [--dir /mnt/loop] [--sizes-mb 1 10 50]
+
+`--dir` should point at the filesystem under test: a tmpfs, or a loop-mounted btrfs/XFS image to see reflinks,
+e.g. `truncate -s 2G img && mkfs.btrfs img && mount -o loop img /mnt/loop`.
+Strategies the filesystem cannot honour fall through to the next one, and the strategy actually used is shown.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from onboarding.copy_strategies import FormCopier  # noqa: E402
+
+STRATEGY_CHAINS = {
+    "copy2": ("copy2",),
+    "blob": ("blob", "copy2"),
+    "reflink": ("reflink", "copy2"),
+}
+
+
+def bench(root, size_mb, copies):
+    template = os.path.join(root, f"Template_{size_mb}MB.pdf")
+    with open(template, "wb") as f:
+        f.write(os.urandom(size_mb * 1024 * 1024))
+
+    rows = []
+    for label, chain in STRATEGY_CHAINS.items():
+        target_dir = os.path.join(root, f"Filled_Forms_{label}")
+        os.makedirs(target_dir)
+        copier = FormCopier(chain)
+        latencies, written, used = [], 0, set()
+        for i in range(copies):
+            start = time.perf_counter()
+            result = copier.copy(template, os.path.join(target_dir, f"copy_{i}.pdf"))
+            latencies.append((time.perf_counter() - start) * 1000)
+            written += result.bytes_written
+            used.add(result.strategy)
+        latencies.sort()
+        rows.append((label, "/".join(sorted(used)), latencies[0], latencies[len(latencies) // 2], latencies[-1],
+                     written))
+        shutil.rmtree(target_dir)
+    os.unlink(template)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", default=None, help="directory on the filesystem to test (default: a temp dir)")
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--copies", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="copy-bench-", dir=args.dir)
+    try:
+        print(f"Benchmarking in {root}")
+        print(f"{'size':>6} {'chain':<8} {'used':<20} {'min ms':>9} {'p50 ms':>8} {'max ms':>8} {'MB written':>11}")
+        for size_mb in args.sizes_mb:
+            for label, used, fastest, p50, worst, written in bench(root, size_mb, args.copies):
+                print(f"{size_mb:>4}MB {label:<8} {used:<20} {fastest:>9.2f} {p50:>8.2f} {worst:>8.2f} "
+                      f"{written / 1024 / 1024:>11.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
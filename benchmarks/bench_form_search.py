@@ -0,0 +1,76 @@
+"""Search-as-you-type latency over a large synthetic form catalog.
+
+Run from the repository root:  python benchmarks/bench_form_search.py [--forms 10000]
+
+Times the search index build, an incremental sync after a few forms change, and each keystroke of a few queries
+(index search plus the forms list model update that the UI performs before rebinding the visible rows).
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from onboarding.form_search import FormSearchIndex  # noqa: E402
+from onboarding.forms_list import FormsListModel  # noqa: E402
+
+WORDS = ("enrollment consent medical allergy policy handbook emergency contact photo release immunization record "
+         "tuition agreement staff background check training certificate infant toddler preschool field trip "
+         "sunscreen medication authorization").split()
+CATEGORIES = ("", "Medical", "Medical/Infants", "Policies", "Staff/HR", "Staff/Training", "Enrollment")
+QUERIES = ("enrollment consent", "med alle", "imunizaton", "handbook")
+
+
+def make_forms(count, seed=0):
+    rng = random.Random(seed)
+    forms = []
+    for i in range(count):
+        category = rng.choice(CATEGORIES)
+        name = f"{' '.join(rng.sample(WORDS, 3)).title()} {i:05d}.pdf"
+        forms.append((f"{category}/{name}" if category else name, f"/forms/{i}"))
+    forms.sort(key=lambda form: form[0].lower())
+    return forms
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def keystroke(index, model, query):
+    found = index.search(query)
+    model.update(found)
+    return len(found)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--forms", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    forms = make_forms(args.forms)
+    index = FormSearchIndex()
+    _, build_ms = timed(lambda: index.sync(forms))
+    changed = sorted(forms[5:] + [(f"Added Form {i}.pdf", f"/forms/added/{i}") for i in range(5)],
+                     key=lambda form: form[0].lower())
+    _, sync_ms = timed(lambda: index.sync(changed))
+    print(f"{args.forms} forms: index build {build_ms:.1f} ms, incremental sync (5 added, 5 removed) {sync_ms:.1f} ms")
+
+    model = FormsListModel()
+    model.update(index.search(""))
+    print(f"{'keystroke':<22} {'matches':>8} {'ms':>7}")
+    samples = []
+    for query in QUERIES:
+        for typed in [query[:end] for end in range(1, len(query) + 1)] + [""]:
+            matches, ms = timed(lambda: keystroke(index, model, typed))
+            samples.append(ms)
+            print(f"{repr(typed) if typed else '(cleared)':<22} {matches:>8} {ms:>7.2f}")
+    print(f"per keystroke: median {statistics.median(samples):.2f} ms, max {max(samples):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
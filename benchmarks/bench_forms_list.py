@@ -0,0 +1,123 @@
+"""Forms list rebuild cost at 100, 1k and 10k forms.
+
+Run from the repository root:  python benchmarks/bench_forms_list.py [--sizes 100 1000 10000]
+
+The model timings run anywhere. The widget timings (old destroy-and-rebuild vs. the virtualized list) need a
+display and are skipped when Tk cannot open one.
+"""
+import argparse
+import sys
+import time
+import tkinter as tk
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from onboarding.forms_list import FormsListModel  # noqa: E402
+
+
+def synthetic_forms(count):
+    return [(f"Form_{i:05d}.pdf", f"/forms/Form_{i:05d}.pdf") for i in range(count)]
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_model(count):
+    forms = synthetic_forms(count)
+    opened = set()
+    model = FormsListModel(lambda name, path: (f"{name}  ✓" if path in opened else name, True))
+
+    def full_build():
+        model.clear()
+        model.update(forms)
+
+    full_ms = timed(full_build)
+    diff_ms = timed(lambda: model.update(forms))
+    target = forms[count // 2][1]
+
+    def mark_one():
+        opened.symmetric_difference_update({target})
+        model.refresh_row(target)
+
+    row_ms = timed(mark_one)
+    return {"model_full_ms": full_ms, "model_rescan_diff_ms": diff_ms, "model_single_row_ms": row_ms}
+
+
+def bench_widgets(count, ctk, VirtualFormsList):
+    forms = synthetic_forms(count)
+    root = ctk.CTk()
+    root.geometry("700x700")
+    results = {}
+    try:
+        scrollable = ctk.CTkScrollableFrame(root, label_text="Old list")
+        scrollable.pack(fill="both", expand=True)
+
+        def old_rebuild():
+            for widget in scrollable.winfo_children():
+                widget.destroy()
+            for name, path in forms:
+                ctk.CTkButton(scrollable, text=name, anchor="w").pack(pady=(2, 3), padx=10, fill="x")
+            root.update_idletasks()
+
+        results["old_rebuild_ms"] = timed(old_rebuild, repeat=1)
+        scrollable.destroy()
+
+        opened = set()
+        model = FormsListModel(lambda name, path: (f"{name}  ✓" if path in opened else name, True))
+        virtual = VirtualFormsList(root, model, on_activate=lambda path, name: None, label_text="Virtual list")
+        virtual.pack(fill="both", expand=True)
+        root.update()
+
+        def virtual_rebuild():
+            model.clear()
+            model.update(forms)
+            virtual.render()
+            root.update_idletasks()
+
+        results["virtual_rebuild_ms"] = timed(virtual_rebuild)
+        target = forms[0][1]
+
+        def virtual_single_row():
+            opened.symmetric_difference_update({target})
+            if model.refresh_row(target):
+                virtual.render()
+            root.update_idletasks()
+
+        results["virtual_single_row_ms"] = timed(virtual_single_row)
+        results["virtual_widgets"] = len(virtual._buttons)
+    finally:
+        root.destroy()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args(argv)
+
+    widgets = None
+    try:
+        import customtkinter as ctk
+        from onboard import VirtualFormsList
+        tk.Tk().destroy()
+        widgets = (ctk, VirtualFormsList)
+    except (ImportError, tk.TclError) as e:
+        print(f"Skipping widget benchmarks: {e}")
+
+    for count in args.sizes:
+        results = bench_model(count)
+        if widgets:
+            results.update(bench_widgets(count, *widgets))
+        print(f"{count:>6} forms: " + ", ".join(
+            f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in results.items()))
+
+
+if __name__ == "__main__":
+    main()
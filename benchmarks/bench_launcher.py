@@ -0,0 +1,73 @@
+"""Launch latency and close tracking of the document launcher, using stub_viewer.py as the viewer.
+
+Run from the repository root:  python benchmarks/bench_launcher.py [--documents 20] [--hold 0.5]
+
+Half of the stub viewers save their document before closing. Every close must be reported once, and
+SaveWatcher.check_now() must tell the saved documents from the untouched ones, which is what the app's
+"did you save?" prompt relies on.
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from onboarding.opener import DocumentLauncher, Opener  # noqa: E402
+from onboarding.save_watcher import SaveWatcher, quick_hash  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--hold", type=float, default=0.5, help="seconds each stub viewer stays open")
+    args = parser.parse_args(argv)
+
+    root = Path(tempfile.mkdtemp(prefix="launcher-bench-"))
+    try:
+        template = root / "Template.pdf"
+        template.write_bytes(b"%PDF-1.4\n" + b"0" * 100_000 + b"\n%%EOF\n")
+        watcher = SaveWatcher(on_saved=lambda key, path: None, use_inotify=False, poll_interval=3600)
+        closed = {}
+        all_closed = threading.Event()
+
+        def on_exit(key, path, returncode):
+            closed[key] = (returncode, watcher.check_now(path), time.perf_counter())
+            if len(closed) == args.documents:
+                all_closed.set()
+
+        stub = (sys.executable, str(BENCH_DIR / "stub_viewer.py"), "--hold", str(args.hold))
+        launchers = {saves: DocumentLauncher(Opener("stub_viewer", stub + (("--save",) if saves else ()), True),
+                                             on_exit) for saves in (False, True)}
+        launch_ms = []
+        started = time.perf_counter()
+        for i in range(args.documents):
+            copy_path = root / f"Copy_{i}.pdf"
+            shutil.copyfile(template, copy_path)
+            watcher.track(i, copy_path, quick_hash(copy_path))
+            start = time.perf_counter()
+            launchers[i % 2 == 1].launch(copy_path, key=i)
+            launch_ms.append((time.perf_counter() - start) * 1000)
+        if not all_closed.wait(args.hold + 30):
+            raise SystemExit(f"only {len(closed)} of {args.documents} viewer closes reported")
+        watcher.close()
+
+        wrong = [i for i, (returncode, saved, _) in closed.items() if returncode or saved != (i % 2 == 1)]
+        last_close = max(at for _, _, at in closed.values())
+        print(f"{args.documents} stub viewers: launch median {statistics.median(launch_ms):.2f} ms, "
+              f"max {max(launch_ms):.2f} ms; all closed {last_close - started:.2f} s after the first launch "
+              f"(hold {args.hold:g} s)")
+        print(f"closes reported: {len(closed)}, saved/unsaved classified wrongly: {len(wrong)}")
+        if wrong:
+            raise SystemExit(1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
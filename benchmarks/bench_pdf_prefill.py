@@ -0,0 +1,65 @@
+"""Cost of prefilling form fields into PDF copies, by template size and cross-reference style.
+
+Run from the repository root:  python benchmarks/bench_pdf_prefill.py [--sizes-mb 0.1 5 30] [--copies 20]
+
+The first prefill of a template parses its field tree (cold); later ones reuse the cached table (warm) and only
+append the update, so warm times and bytes appended should not grow with the template size.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from onboarding.pdf_prefill import prefill_pdf, template_fields  # noqa: E402
+from synthetic_forms import write_fillable_pdf  # noqa: E402
+
+VALUES = {"Parent Name": "Jordan Example", "Date": "01/02/2026"}
+
+
+def bench(root, size_mb, xref_stream, copies):
+    template = os.path.join(root, f"Template_{size_mb}MB_{'xrefstm' if xref_stream else 'table'}.pdf")
+    write_fillable_pdf(template, scan_size_mb=size_mb, xref_stream=xref_stream)
+    samples = []
+    appended = 0
+    for i in range(copies):
+        copy_path = os.path.join(root, f"copy_{i}.pdf")
+        shutil.copyfile(template, copy_path)
+        start = time.perf_counter()
+        appended = prefill_pdf(template, copy_path, VALUES)
+        samples.append((time.perf_counter() - start) * 1000)
+        if i == 0:
+            filled = {field.name: field.value.get("V") for field in template_fields(copy_path).fields}
+            if filled.get("Parent Name") != VALUES["Parent Name"].encode():
+                raise SystemExit(f"prefill not visible in {copy_path}: {filled}")
+        os.unlink(copy_path)
+    return samples[0], statistics.median(samples[1:] or samples), appended
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[0.1, 5, 30])
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--dir", default=None)
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="prefill-bench-", dir=args.dir)
+    try:
+        print(f"{'size':>7} {'xref':<8} {'cold ms':>8} {'warm ms':>8} {'appended':>9}")
+        for size_mb in args.sizes_mb:
+            for xref_stream in (False, True):
+                cold, warm, appended = bench(root, size_mb, xref_stream, args.copies)
+                print(f"{size_mb:>5g}MB {'stream' if xref_stream else 'table':<8} {cold:>8.2f} {warm:>8.3f} "
+                      f"{appended:>9}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
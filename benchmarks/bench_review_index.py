@@ -0,0 +1,91 @@
+"""Cost of the office review index over a Filled_Forms directory holding years of copies.
+
+Run from the repository root:  python benchmarks/bench_review_index.py [--flat 20000] [--archived 500000]
+
+Creates `--flat` empty copies in Filled_Forms and an archive manifest listing `--archived` more (as compaction
+would leave them), then times the first index build, a refresh with nothing changed, a refresh after a few new
+copies, and the two review queries.
+"""
+import argparse
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from onboarding.compaction import ARCHIVE_DIRNAME, ArchiveManifest  # noqa: E402
+from onboarding.forms_core import copied_form_name  # noqa: E402
+from onboarding.review import ReviewIndex, start_of_week  # noqa: E402
+
+TEMPLATES = ["Enrollment.pdf", "Medical/Allergy Plan.pdf", "Photo Release.docx", "Emergency Contacts.pdf",
+             "Immunization Record.pdf", "Handbook Acknowledgement.pdf"]
+
+
+def copy_names(count, newest, rng):
+    # One family every few hours going back from `newest`, each filling every template over a few minutes.
+    names = []
+    when = newest
+    family = 0
+    while len(names) < count:
+        family += 1
+        when -= timedelta(hours=rng.randint(1, 12))
+        for i, template in enumerate(TEMPLATES[:count - len(names)]):
+            names.append(copied_form_name(template, "Parent", f"Family {family:07d}", when + timedelta(minutes=i),
+                                          kiosk_id="bench", sequence=len(names)))
+    return names
+
+
+def timed(fn, repeat=1):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flat", type=int, default=20000, help="copies left in Filled_Forms")
+    parser.add_argument("--archived", type=int, default=500000, help="copies listed in the archive manifest")
+    parser.add_argument("--dir", default=None)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    root = Path(tempfile.mkdtemp(prefix="review-bench-", dir=args.dir))
+    try:
+        filled_forms_dir = root / "Filled_Forms"
+        filled_forms_dir.mkdir()
+        for name in copy_names(args.flat, datetime.now(), rng):
+            (filled_forms_dir / name).touch()
+        manifest = ArchiveManifest(filled_forms_dir / ARCHIVE_DIRNAME)
+        manifest.add_many((name, "Parent", "x", "20200101", "Parent/2020/x.zip", name, 0, 0, "2020-01-01T00:00:00")
+                          for name in copy_names(args.archived, datetime.now() - timedelta(days=60), rng))
+        manifest.close()
+
+        index = ReviewIndex(filled_forms_dir)
+        build_ms, (added, _) = timed(index.refresh)
+        print(f"{args.flat} flat + {args.archived} archived copies: first build {build_ms:.0f} ms ({added} indexed)")
+        print(f"refresh, nothing changed: {timed(index.refresh, 20)[0]:.3f} ms")
+        for i in range(5):
+            (filled_forms_dir / copied_form_name("Enrollment.pdf", "Parent", f"Walk-in {i}", kiosk_id="bench",
+                                                 sequence=10 ** 9 + i)).touch()
+        refresh_ms, (added, removed) = timed(index.refresh)
+        print(f"refresh after 5 new copies: {refresh_ms:.1f} ms (+{added} -{removed})")
+        family_ms, forms = timed(lambda: index.family_forms("Parent", "Family 0000042"), 20)
+        print(f"family lookup: {family_ms:.3f} ms ({len(forms)} forms)")
+        week_ms, families = timed(lambda: index.families_since(start_of_week(), "Parent"), 20)
+        print(f"families this week: {week_ms:.3f} ms ({len(families)} families)")
+        index.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
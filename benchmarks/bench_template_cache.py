@@ -0,0 +1,62 @@
+"""Cost of opening forms with and without the local template cache, by template size.
+
+Run from the repository root:  python benchmarks/bench_template_cache.py [--sizes-mb 0.1 5 50] [--opens 10]
+[--share-dir /mnt/forms-share]
+
+Point --share-dir at a mounted network share to see the effect of the cache on real kiosks; by default the
+templates and Filled_Forms live in a local temp folder, which shows the cache's own overhead. "cold" is the
+first cached open of a template (fetch + hash), "warm" the median of the later ones, which only stat the share.
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from onboarding.copy_strategies import FormCopier, TemplateBlobStore  # noqa: E402
+from onboarding.forms_core import prepare_form_copy  # noqa: E402
+from synthetic_forms import write_fillable_pdf  # noqa: E402
+
+
+def open_times(forms_dir, template, opens, template_cache, label):
+    samples = []
+    for i in range(opens):
+        start = time.perf_counter()
+        prepare_form_copy(FormCopier(), str(template), template.name, forms_dir, "Parent", f"{label} Family {i}",
+                          template_cache)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[0.1, 5, 50])
+    parser.add_argument("--opens", type=int, default=10)
+    parser.add_argument("--share-dir", default=None, help="folder on the share to create the templates in")
+    args = parser.parse_args(argv)
+
+    forms_dir = Path(tempfile.mkdtemp(prefix="template-cache-bench-", dir=args.share_dir))
+    cache_dir = Path(tempfile.mkdtemp(prefix="template-cache-"))
+    try:
+        template_cache = TemplateBlobStore(cache_dir, 1024 * 1024 * 1024)
+        print(f"{'size':>7} {'uncached ms':>12} {'cold ms':>8} {'warm ms':>8}")
+        for size_mb in args.sizes_mb:
+            template = forms_dir / f"Template_{size_mb:g}MB.pdf"
+            write_fillable_pdf(template, scan_size_mb=size_mb)
+            uncached = open_times(forms_dir, template, args.opens, None, "Uncached")
+            cached = open_times(forms_dir, template, args.opens, template_cache, "Cached")
+            print(f"{size_mb:>5g}MB {statistics.median(uncached):>12.2f} {cached[0]:>8.2f} "
+                  f"{statistics.median(cached[1:] or cached):>8.2f}")
+        print(f"cache: {template_cache.stats()}")
+    finally:
+        shutil.rmtree(forms_dir, ignore_errors=True)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Benchmark suite for the forms pipeline, emitting JSON.
+
+Run from the repository root:
+
+    python benchmarks/run_benchmarks.py --forms 1000 --large-scans 2 --output results.json
+
+Covers the directory scan/filter/sort, copy-and-name (including the session index) and session lookup paths
+headlessly. Tk widget rebuilds are included when a display is available, or when Xvfb is installed, in which case a
+virtual display is started for the run. Keep the JSON files to compare runs over time.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from onboarding.catalog import FormCatalog, scan_forms  # noqa: E402
+from onboarding.copy_strategies import FormCopier  # noqa: E402
+from onboarding.forms_core import prepare_form_copy  # noqa: E402
+from onboarding.session_index import SessionIndex, template_version  # noqa: E402
+from synthetic_forms import make_forms_tree  # noqa: E402
+
+
+def measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"runs": repeat, "min_ms": min(samples), "median_ms": statistics.median(samples), "max_ms": max(samples)}
+
+
+def bench_scan(forms_dir, repeat):
+    results = {"scan_forms": measure(lambda: scan_forms(forms_dir), repeat)}
+    catalog = FormCatalog(use_inotify=False, revalidate_interval=3600)
+    results["catalog_cold"] = measure(lambda: (catalog.invalidate(forms_dir), catalog.get(forms_dir)), repeat)
+    results["catalog_hit"] = measure(lambda: catalog.get(forms_dir), repeat)
+    results["forms_found"] = len(catalog.get(forms_dir))
+    catalog.close()
+    return results
+
+
+def bench_copy(forms_dir, copies):
+    forms = scan_forms(forms_dir)
+    small = [form for form in forms if not form[0].startswith("Scanned")][:copies]
+    large = [form for form in forms if form[0].startswith("Scanned")]
+    results = {}
+    for label, selection in (("copy_small_form", small), ("copy_large_scan", large)):
+        if not selection:
+            continue
+        copier = FormCopier()
+        samples, strategies = [], set()
+        for i, (form_name, form_path) in enumerate(selection):
+            start = time.perf_counter()
+            form_copy = prepare_form_copy(copier, form_path, form_name, forms_dir, "Parent", f"Bench User {i}")
+            samples.append((time.perf_counter() - start) * 1000)
+            strategies.add(form_copy.copy_result.strategy)
+        results[label] = {"runs": len(samples), "min_ms": min(samples), "median_ms": statistics.median(samples),
+                          "max_ms": max(samples), "strategies": sorted(strategies)}
+    return results
+
+
+def bench_session_lookup(forms_dir, records, repeat):
+    filled_dir = Path(tempfile.mkdtemp(dir=forms_dir, prefix="index-"))
+    index = SessionIndex(filled_dir)
+    version = template_version(scan_forms(forms_dir)[0][1])
+    for i in range(records):
+        index.record("Parent", f"Family {i:06d}", "Enrollment.pdf", version, filled_dir / f"copy_{i}.pdf")
+    target = f"Family {records // 2:06d}"
+    results = {
+        "records": records,
+        "session_lookup": measure(lambda: index.lookup("Parent", target, "Enrollment.pdf", version), repeat),
+        "session_copies_for_user": measure(lambda: index.copies_for_user("Parent", target), repeat),
+    }
+    index.close()
+    return results
+
+
+def _start_virtual_display():
+    if os.environ.get("DISPLAY") or platform.system() != "Linux" or not shutil.which("Xvfb"):
+        return None
+    display = ":93"
+    process = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    os.environ["DISPLAY"] = display
+    return process
+
+
+def bench_widgets(sizes):
+    import tkinter as tk
+
+    xvfb = _start_virtual_display()
+    try:
+        try:
+            import customtkinter as ctk
+            from onboard import VirtualFormsList
+            tk.Tk().destroy()
+        except (ImportError, tk.TclError) as e:
+            return {"skipped": str(e)}
+        from bench_forms_list import bench_widgets as bench_widget_size
+        return {str(size): bench_widget_size(size, ctk, VirtualFormsList) for size in sizes}
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+
+def run(args, forms_dir):
+    make_forms_tree(forms_dir, args.forms, args.large_scans, args.large_size_mb, args.non_forms)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "host": platform.node(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "params": vars(args),
+        },
+        "scan": bench_scan(forms_dir, args.repeat),
+        "copy": bench_copy(forms_dir, args.copies),
+        "session_index": bench_session_lookup(forms_dir, args.index_records, args.repeat),
+    }
+    if args.widget_sizes:
+        report["widgets"] = bench_widgets(args.widget_sizes)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--forms", type=int, default=500, help="number of small forms in the synthetic tree")
+    parser.add_argument("--large-scans", type=int, default=2, help="number of large scanned PDFs")
+    parser.add_argument("--large-size-mb", type=int, default=50)
+    parser.add_argument("--non-forms", type=int, default=50, help="non-form files the scan must skip")
+    parser.add_argument("--copies", type=int, default=50, help="small forms to copy in the copy benchmark")
+    parser.add_argument("--index-records", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--widget-sizes", type=int, nargs="*", default=[100, 1000],
+                        help="list sizes for the Tk benchmarks (empty to skip)")
+    parser.add_argument("--dir", default=None, help="where to build the synthetic tree (e.g. a network share)")
+    parser.add_argument("--output", default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="forms-bench-", dir=args.dir)
+    # The pipeline logs with print(); keep stdout for the JSON report.
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            report = run(args, Path(root) / "forms")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
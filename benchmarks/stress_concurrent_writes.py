@@ -0,0 +1,135 @@
+"""Multi-process stress test for concurrent writes into one shared Filled_Forms directory.
+
+Run from the repository root:  python benchmarks/stress_concurrent_writes.py [--writers 1 2 4 8] [--dir /mnt/share]
+
+Each writer process acts as a separate kiosk (its own KIOSK_ID) and copies every template for its own families
+plus a set of families shared by all kiosks, so copies land in the same second (the case that collided with
+second-resolution names) and kiosks race to create the same family's copy. Afterwards the directory is checked
+for lost, orphaned or corrupt copies, leftover temp files and a session index that matches the files on disk.
+Prints throughput per writer count; exits non-zero if any check fails.
+"""
+import argparse
+import hashlib
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from onboarding import config  # noqa: E402
+from onboarding.copy_strategies import FormCopier  # noqa: E402
+from onboarding.forms_core import parse_copied_form_name, prepare_form_copy  # noqa: E402
+from onboarding.session_index import SESSION_INDEX_FILENAME  # noqa: E402
+
+TEMPLATES = ("Enrollment.pdf", "Medical_Consent.pdf", "Emergency_Contacts.docx")
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def writer(forms_dir, kiosk_id, families, barrier, results):
+    os.environ["KIOSK_ID"] = kiosk_id
+    config.get_config.cache_clear()
+    copier = FormCopier()
+    barrier.wait()
+    start = time.perf_counter()
+    written = 0
+    for family in families:
+        for template in TEMPLATES:
+            prepare_form_copy(copier, os.path.join(forms_dir, template), template, forms_dir, "Parent", family)
+            written += 1
+    results.put((kiosk_id, written, time.perf_counter() - start))
+
+
+def verify(forms_dir, families):
+    filled_dir = Path(forms_dir) / config.FILLED_FORMS_SUBDIR
+    problems = []
+    template_digests = {os.path.splitext(t)[0]: _digest(os.path.join(forms_dir, t)) for t in TEMPLATES}
+
+    names = [entry.name for entry in os.scandir(filled_dir) if entry.is_file()]
+    leftovers = [name for name in names if name.endswith(".partial")]
+    copies = [name for name in names if not name.startswith(".")]
+    expected = len(families) * len(TEMPLATES)
+    if leftovers:
+        problems.append(f"{len(leftovers)} temp files left behind")
+    if len(copies) != expected:
+        problems.append(f"expected {expected} copies, found {len(copies)}")
+    for name in copies:
+        parsed = parse_copied_form_name(name)
+        if parsed is None or parsed.kiosk_id is None:
+            problems.append(f"unparseable copy name: {name}")
+        elif _digest(filled_dir / name) != template_digests[parsed.base]:
+            problems.append(f"corrupt copy: {name}")
+
+    conn = sqlite3.connect(str(filled_dir / SESSION_INDEX_FILENAME))
+    rows = conn.execute("SELECT copied_name FROM copies").fetchall()
+    sequences = dict(conn.execute("SELECT kiosk_id, seq FROM kiosk_sequences").fetchall())
+    conn.close()
+    if len(rows) != expected:
+        problems.append(f"expected {expected} index rows, found {len(rows)}")
+    indexed = {name for (name,) in rows}
+    if indexed != set(copies):
+        problems.append(f"{len(indexed - set(copies))} index rows without a file, "
+                        f"{len(set(copies) - indexed)} orphaned copies")
+    if sum(sequences.values()) < len(copies):
+        problems.append(f"kiosk sequences {sequences} do not cover {len(copies)} copies")
+    return problems
+
+
+def run(root, writers, own_families, shared_families, template_kb):
+    forms_dir = os.path.join(root, f"forms_{writers}")
+    os.makedirs(forms_dir)
+    for template in TEMPLATES:
+        with open(os.path.join(forms_dir, template), "wb") as f:
+            f.write(os.urandom(template_kb * 1024))
+
+    barrier = multiprocessing.Barrier(writers)
+    results = multiprocessing.Queue()
+    families = {f"kiosk{i}": [f"Kiosk{i} Family {j:03d}" for j in range(own_families)] + shared_families
+                for i in range(writers)}
+    processes = [multiprocessing.Process(target=writer, args=(forms_dir, kiosk_id, kiosk_families, barrier, results))
+                 for kiosk_id, kiosk_families in families.items()]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = max(seconds for _, _, seconds in reports)
+    copies = sum(written for _, written, _ in reports)
+    all_families = {family for kiosk_families in families.values() for family in kiosk_families}
+    return copies, elapsed, verify(forms_dir, all_families)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--families", type=int, default=20, help="families only one writer copies packets for")
+    parser.add_argument("--shared-families", type=int, default=10, help="families every writer copies packets for")
+    parser.add_argument("--template-kb", type=int, default=256)
+    parser.add_argument("--dir", default=None, help="directory to hammer (e.g. the SMB share); default temp dir")
+    args = parser.parse_args(argv)
+
+    shared_families = [f"Shared Family {i:03d}" for i in range(args.shared_families)]
+    root = tempfile.mkdtemp(prefix="kiosk-stress-", dir=args.dir)
+    failed = False
+    try:
+        print(f"{'writers':>7} {'forms':>7} {'seconds':>8} {'files/s':>8} {'MB/s':>7}  result")
+        for writers in args.writers:
+            copies, elapsed, problems = run(root, writers, args.families, shared_families, args.template_kb)
+            failed |= bool(problems)
+            print(f"{writers:>7} {copies:>7} {elapsed:>8.2f} {copies / elapsed:>8.1f} "
+                  f"{copies * args.template_kb / 1024 / elapsed:>7.1f}  {'; '.join(problems) or 'OK'}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""Stand-in for a document viewer, for trying the launcher without a desktop.
+
+Use it as the opener, e.g. in .env:
+
+    DOCUMENT_OPENER=python benchmarks/stub_viewer.py --hold 5 --save
+
+It "shows" the document for --hold seconds, optionally saves it (appends an incremental-update comment, which
+changes the file the way a PDF viewer's save does), then exits like a closed viewer window. --log appends one
+JSON line per document to a file.
+"""
+import argparse
+import json
+import os
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--hold", type=float, default=2.0, help="seconds before the 'window' closes")
+    parser.add_argument("--save", action="store_true", help="modify the document before closing")
+    parser.add_argument("--exit-code", type=int, default=0)
+    parser.add_argument("--log", default=None)
+    args = parser.parse_args(argv)
+
+    opened_at = time.time()
+    time.sleep(args.hold)
+    if args.save:
+        with open(args.path, "ab") as f:
+            f.write(f"\n% saved by stub viewer {os.getpid()} at {time.time():.3f}\n".encode())
+    if args.log:
+        with open(args.log, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"pid": os.getpid(), "path": args.path, "saved": args.save,
+                                "opened_at": opened_at, "closed_at": time.time()}) + "\n")
+    return args.exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
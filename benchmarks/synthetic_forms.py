@@ -0,0 +1,126 @@
+"""Synthetic forms directories for the benchmarks."""
+import os
+import random
+
+FORM_MIX = ((".pdf", 6), (".docx", 3), (".doc", 1))
+NON_FORM_EXTENSIONS = (".txt", ".xlsx", ".png", ".tmp")
+
+
+def _write(path, size):
+    with open(path, "wb") as f:
+        remaining = size
+        chunk = os.urandom(min(size, 1024 * 1024))
+        while remaining > 0:
+            f.write(chunk[:remaining])
+            remaining -= len(chunk)
+
+
+def make_forms_tree(root, forms=200, large_scans=2, large_size_mb=50, non_forms=20, small_kb=64, seed=0):
+    """Populate `root` with `forms` small forms (mixed .pdf/.docx/.doc), `large_scans` scanned PDFs of
+    `large_size_mb` MB and `non_forms` files the app must ignore. Returns the list of form paths."""
+    rng = random.Random(seed)
+    extensions = [ext for ext, weight in FORM_MIX for _ in range(weight)]
+    os.makedirs(root, exist_ok=True)
+    paths = []
+    for i in range(forms):
+        path = os.path.join(root, f"Form {i:05d} {rng.choice(('Enrollment', 'Consent', 'Policy'))}"
+                                  f"{rng.choice(extensions)}")
+        _write(path, small_kb * 1024)
+        paths.append(path)
+    for i in range(large_scans):
+        path = os.path.join(root, f"Scanned Packet {i:02d}.pdf")
+        _write(path, large_size_mb * 1024 * 1024)
+        paths.append(path)
+    for i in range(non_forms):
+        _write(os.path.join(root, f"notes_{i:04d}{rng.choice(NON_FORM_EXTENSIONS)}"), 1024)
+    os.makedirs(os.path.join(root, "Filled_Forms"), exist_ok=True)
+    return paths
+
+
+def write_fillable_pdf(path, field_names=("Parent Name", "Child Name", "Date"), scan_size_mb=0.0,
+                       xref_stream=False):
+    """Write a one-page PDF with a text field per name and a `scan_size_mb` MB image standing in for a scan.
+
+    With `xref_stream` the fields and AcroForm sit in a compressed object stream indexed by a predicted
+    cross-reference stream (PDF 1.5 style); otherwise everything is a plain object in a classic xref table.
+    """
+    import zlib
+
+    field_nums = list(range(10, 10 + len(field_names)))
+    refs = " ".join(f"{num} 0 R" for num in field_nums)
+    image_width = 1000
+    image_height = max(1, int(scan_size_mb * 1024 * 1024) // image_width)
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R /AcroForm 3 0 R >>",
+        2: b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+        3: f"<< /Fields [{refs}] /DA (/Helv 10 Tf 0 g) /DR << /Font << /Helv 5 0 R >> >> >>".encode(),
+        4: f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Annots [{refs}] /Contents 6 0 R "
+           f"/Resources << /XObject << /Im0 7 0 R >> >> >>".encode(),
+        5: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for i, (num, name) in enumerate(zip(field_nums, field_names)):
+        objects[num] = (f"<< /Type /Annot /Subtype /Widget /FT /Tx /T ({name}) /F 4 /P 4 0 R "
+                        f"/Rect [72 {700 - 40 * i} 372 {720 - 40 * i}] /DA (/Helv 10 Tf 0 g) >>").encode()
+    content = b"q 612 0 0 792 0 0 cm /Im0 Do Q"
+    streams = {
+        6: (b"<< /Length %d >>" % len(content), content),
+        7: (b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+            b"/BitsPerComponent 8 /Length %d >>" % (image_width, image_height, image_width * image_height), None),
+    }
+    compressed = [3] + field_nums if xref_stream else []
+
+    offsets = {}
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.5\n%\xe2\xe3\xcf\xd3\n")
+        for num in sorted(objects):
+            if num not in compressed:
+                offsets[num] = f.tell()
+                f.write(b"%d 0 obj\n%s\nendobj\n" % (num, objects[num]))
+        for num, (stream_dict, data) in streams.items():
+            offsets[num] = f.tell()
+            f.write(b"%d 0 obj\n%s\nstream\n" % (num, stream_dict))
+            if data is None:
+                remaining = image_width * image_height
+                chunk = os.urandom(min(remaining, 1024 * 1024))
+                while remaining > 0:
+                    f.write(chunk[:remaining])
+                    remaining -= len(chunk)
+            else:
+                f.write(data)
+            f.write(b"\nendstream\nendobj\n")
+        if not xref_stream:
+            size = max(offsets) + 1
+            xref_offset = f.tell()
+            f.write(b"xref\n0 %d\n0000000000 65535 f\r\n" % size)
+            for num in range(1, size):
+                f.write(b"%010d 00000 n\r\n" % offsets[num] if num in offsets else b"0000000000 00000 f\r\n")
+            f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_offset))
+            return
+
+        objstm_num = max(objects) + 1
+        bodies = [objects[num] for num in compressed]
+        header = b" ".join(b"%d %d" % (num, sum(len(b) + 1 for b in bodies[:i])) for i, num in enumerate(compressed))
+        first = len(header) + 1
+        data = zlib.compress(header + b"\n" + b"\n".join(bodies))
+        offsets[objstm_num] = f.tell()
+        f.write(b"%d 0 obj\n<< /Type /ObjStm /N %d /First %d /Filter /FlateDecode /Length %d >>\nstream\n%s"
+                b"\nendstream\nendobj\n" % (objstm_num, len(compressed), first, len(data), data))
+        xref_num = objstm_num + 1
+        offsets[xref_num] = f.tell()
+        rows = []
+        for num in range(xref_num + 1):
+            if num in offsets:
+                rows.append(b"\x01" + offsets[num].to_bytes(4, "big") + b"\x00\x00")
+            elif num in compressed:
+                rows.append(b"\x02" + objstm_num.to_bytes(4, "big") + compressed.index(num).to_bytes(2, "big"))
+            else:
+                rows.append(b"\x00" + b"\x00" * 4 + (b"\xff\xff" if num == 0 else b"\x00\x00"))
+        # PNG "Up" predictor, as most writers use for xref streams.
+        predicted, previous = [], bytes(7)
+        for row in rows:
+            predicted.append(b"\x02" + bytes((a - b) & 0xFF for a, b in zip(row, previous)))
+            previous = row
+        data = zlib.compress(b"".join(predicted))
+        f.write(b"%d 0 obj\n<< /Type /XRef /Size %d /W [1 4 2] /Root 1 0 R /Filter /FlateDecode "
+                b"/DecodeParms << /Predictor 12 /Columns 7 >> /Length %d >>\nstream\n%s\nendstream\nendobj\n"
+                b"startxref\n%d\n%%%%EOF\n" % (xref_num, xref_num + 1, len(data), data, offsets[xref_num]))
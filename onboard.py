@@ -1,98 +1,281 @@
+import time
+
+_STARTUP_T0 = time.perf_counter()
+
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import messagebox
+import argparse
+import functools
 import os
-import platform
-import subprocess
-import shutil
-from pathlib import Path
-from dotenv import load_dotenv, find_dotenv
-from datetime import datetime
-
-# --- Env Variables ---
-dotenv_path = find_dotenv(usecwd=True, raise_error_if_not_found=False)
-if dotenv_path:
-    print(f"Loading .env file from: {dotenv_path}")
-    load_dotenv(dotenv_path)
-else:
-    print("No .env file found. Using default directory settings.")
-
-# --- Config ---
-DAYCARE_NAME_FROM_ENV = os.getenv("DAYCARE_NAME", "Daycare")
-APP_NAME = f"{DAYCARE_NAME_FROM_ENV} Onboarding Forms"
-FILLED_FORMS_SUBDIR = "Filled_Forms"
+import sys
+import threading
+
+from onboarding.config import FILLED_FORMS_SUBDIR, SCRIPT_ROOT_DIR, forms_dir_for_user_type, get_config, get_forms_dirs
+from onboarding.forms_list import FormsListModel
+from onboarding.tracing import TRACER
+
+# Modules only needed once a form is opened (sqlite3, hashlib, subprocess, ...) are imported where they are used,
+# so they stay off the path to the first paint of the user type screen.
+
+_IMPORTS_DONE_T = time.perf_counter()
 
 ctk.set_appearance_mode("System")
 ctk.set_default_color_theme("blue")
 
-# --- Path Config ---
-SCRIPT_ROOT_DIR = Path(__file__).resolve().parent
-
-env_parent_forms_dir_str = os.getenv("PARENT_FORMS_DIR")
-env_staff_forms_dir_str = os.getenv("STAFF_FORMS_DIR")
-
-if env_parent_forms_dir_str and Path(env_parent_forms_dir_str).is_dir():
-    ACTUAL_PARENT_FORMS_DIR = Path(env_parent_forms_dir_str)
-    PARENT_DIR_SOURCE_MSG = f"Using PARENT_FORMS_DIR from .env: {ACTUAL_PARENT_FORMS_DIR}"
-else:
-    ACTUAL_PARENT_FORMS_DIR = SCRIPT_ROOT_DIR
-    if env_parent_forms_dir_str:
-        PARENT_DIR_SOURCE_MSG = f"Warning: PARENT_FORMS_DIR '{env_parent_forms_dir_str}' from .env is invalid. Defaulting to script root: {SCRIPT_ROOT_DIR}"
-    else:
-        PARENT_DIR_SOURCE_MSG = f"PARENT_FORMS_DIR not in .env. Defaulting to script root: {SCRIPT_ROOT_DIR}"
-print(PARENT_DIR_SOURCE_MSG)
-
-if env_staff_forms_dir_str and Path(env_staff_forms_dir_str).is_dir():
-    ACTUAL_STAFF_FORMS_DIR = Path(env_staff_forms_dir_str)
-    STAFF_DIR_SOURCE_MSG = f"Using STAFF_FORMS_DIR from .env: {ACTUAL_STAFF_FORMS_DIR}"
-else:
-    ACTUAL_STAFF_FORMS_DIR = SCRIPT_ROOT_DIR
-    if env_staff_forms_dir_str:
-        STAFF_DIR_SOURCE_MSG = f"Warning: STAFF_FORMS_DIR '{env_staff_forms_dir_str}' from .env is invalid. Defaulting to script root: {SCRIPT_ROOT_DIR}"
-    else:
-        STAFF_DIR_SOURCE_MSG = f"STAFF_FORMS_DIR not in .env. Defaulting to script root: {SCRIPT_ROOT_DIR}"
-print(STAFF_DIR_SOURCE_MSG)
+
+class VirtualFormsList(ctk.CTkFrame):
+    """Scrollable list of form buttons that only creates widgets for the rows currently visible.
+
+    A fixed pool of buttons is rebound to rows of a FormsListModel as the list scrolls, so the cost of a
+    refresh depends on the window height rather than on the number of forms in the directory.
+    """
+
+    ROW_HEIGHT = 33  # CTkButton default height (28) plus the (2, 3) vertical padding
+    WHEEL_STEP = 3
+
+    def __init__(self, master, model, on_activate, label_text="", label_font=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = model
+        self.on_activate = on_activate
+        self._top = 0
+        self._capacity = 0
+        self._buttons = []
+        self._slot_rows = []
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self._label = ctk.CTkLabel(self, text=label_text, font=label_font, corner_radius=6,
+                                   fg_color=ctk.ThemeManager.theme["CTkScrollableFrame"]["label_fg_color"])
+        self._label.grid(row=0, column=0, columnspan=2, sticky="ew", padx=6, pady=(6, 2))
+
+        self._body = ctk.CTkFrame(self, fg_color="transparent")
+        self._body.grid(row=1, column=0, sticky="nsew", pady=(0, 6))
+        self._body.grid_columnconfigure(0, weight=1)
+        self._body.grid_propagate(False)
+        self._body.bind("<Configure>", self._on_body_configure)
+
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, 4), pady=(0, 6))
+
+        self._message_label = ctk.CTkLabel(self._body, text="")
+
+        for widget in (self._body, self._message_label):
+            self._bind_mousewheel(widget)
+
+    def set_label(self, text):
+        self._label.configure(text=text)
+
+    def show_message(self, text):
+        for button in self._buttons:
+            button.grid_remove()
+        self._slot_rows = [None] * len(self._buttons)
+        self._message_label.configure(text=text)
+        self._message_label.grid(row=0, column=0, pady=10, padx=10)
+        self._scrollbar.set(0.0, 1.0)
+
+    def scroll_to_top(self):
+        self._top = 0
+
+    def render(self):
+        """Rebind visible slots to model rows. Slots whose row did not change are left untouched."""
+        self._message_label.grid_remove()
+        total = len(self.model.rows)
+        self._top = max(0, min(self._top, total - self._capacity))
+        for slot, button in enumerate(self._buttons):
+            index = self._top + slot
+            if slot < self._capacity and index < total:
+                row = self.model.rows[index]
+                if self._slot_rows[slot] != row:
+                    button.configure(text=row.text, state="normal" if row.enabled else "disabled")
+                    if self._slot_rows[slot] is None:
+                        button.grid()
+                    self._slot_rows[slot] = row
+            elif self._slot_rows[slot] is not None:
+                button.grid_remove()
+                self._slot_rows[slot] = None
+        if total:
+            self._scrollbar.set(self._top / total, min(1.0, (self._top + self._capacity) / total))
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    def _on_body_configure(self, event):
+        row_height = self._apply_widget_scaling(self.ROW_HEIGHT)
+        capacity = max(1, int(event.height // row_height))
+        if capacity == self._capacity:
+            return
+        self._capacity = capacity
+        while len(self._buttons) < capacity:
+            slot = len(self._buttons)
+            button = ctk.CTkButton(self._body, text="", anchor="w", command=lambda s=slot: self._activate_slot(s))
+            button.grid(row=slot, column=0, pady=(2, 3), padx=10, sticky="ew")
+            button.grid_remove()
+            self._bind_mousewheel(button)
+            self._buttons.append(button)
+            self._slot_rows.append(None)
+        if not self._message_label.winfo_ismapped():
+            self.render()
+
+    def _activate_slot(self, slot):
+        row = self._slot_rows[slot]
+        if row is not None and row.enabled:
+            self.on_activate(row.path, row.name)
+
+    def _scroll_by(self, rows):
+        self._top += rows
+        self.render()
+
+    def _on_scrollbar(self, *args):
+        if self._message_label.winfo_ismapped():
+            return
+        if args[0] == "moveto":
+            self._top = int(float(args[1]) * len(self.model.rows))
+            self.render()
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self._scroll_by(step * self._capacity if args[2] == "pages" else step)
+
+    def _on_mousewheel(self, event):
+        if self._message_label.winfo_ismapped():
+            return
+        direction = -1 if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0 else 1
+        self._scroll_by(direction * self.WHEEL_STEP)
+
+    def _bind_mousewheel(self, widget):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self._on_mousewheel)
 
 
 class App(ctk.CTk):
+    COMPACTION_START_DELAY_MS = 10_000
+    DOCUMENT_LAUNCHER_START_DELAY_MS = 1_000
+    OPEN_ALL_CONCURRENCY = 2
+    ALL_FORM_CATEGORIES = "All categories"
+    TOP_LEVEL_FORM_CATEGORY = "(top level)"
+
     def __init__(self):
         super().__init__()
 
-        self.title(APP_NAME)
+        self.title(get_config().app_name)
         self.geometry("700x700")
 
         self.user_type = None
         self.active_forms_directory = None
         self.available_forms = []
+        self.forms_list_model = FormsListModel(self._form_row_text)
+        self.forms_search_var = tk.StringVar(value="")
+        self.forms_search_var.trace_add("write", self._on_forms_search_changed)
+        self._forms_search_pending = False
         self.debug_mode_var = tk.BooleanVar(value=False)
+        self.debug_mode_var.trace_add("write", self._on_debug_mode_toggled)
+        if get_config().trace_export_path:
+            TRACER.export_to(get_config().trace_export_path)
 
         self.current_session_user_name = None
         self.opened_original_forms_for_user = set()
-        self.user_specific_copied_forms = {}
+        self.saved_original_forms_for_user = set()
         self.all_forms_popup_shown_for_current_user_set = False
-
+        self.pending_form_opens = set()
+        self.queued_form_opens = []  # (form_name, path) waiting for "Open All Remaining"
+        self.open_all_in_flight = set()
+        self.open_all_opened_count = 0
+        self._session_generation = 0
+        self.compaction_jobs = []
+
+        # The name entry and main app screens are built on first navigation (see _ensure_*_screen).
         self.user_type_frame = ctk.CTkFrame(self, fg_color="transparent")
         self._setup_user_type_selection_screen()
 
-        self.name_entry_frame = ctk.CTkFrame(self, fg_color="transparent")
-        self._setup_name_entry_screen()
-
-        self.main_app_frame = ctk.CTkFrame(self, fg_color="transparent")
-        self.main_app_frame.grid_columnconfigure(0, weight=1)
-        self.main_app_frame.grid_rowconfigure(1, weight=1)
-        self._setup_main_app_ui_elements()
-
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
         self.user_type_frame.grid(row=0, column=0, sticky="nsew")
 
+        if get_config().compact_after_days is not None:
+            self.after(self.COMPACTION_START_DELAY_MS, self._start_background_compaction)
+        self.after(self.DOCUMENT_LAUNCHER_START_DELAY_MS, self._start_document_launcher)
+
+    @functools.cached_property
+    def form_catalog(self):
+        from onboarding.catalog import FormCatalog
+        return FormCatalog(on_change=lambda directory: self._post_to_ui(self._on_catalog_changed, directory),
+                           recursive=get_config().scan_subfolders)
+
+    @functools.cached_property
+    def form_search_index(self):
+        from onboarding.form_search import FormSearchIndex
+        return FormSearchIndex()
+
+    @functools.cached_property
+    def form_worker_pool(self):
+        from concurrent.futures import ThreadPoolExecutor
+        return ThreadPoolExecutor(max_workers=2, thread_name_prefix="form-worker")
+
+    @functools.cached_property
+    def save_watcher(self):
+        from onboarding.save_watcher import SaveWatcher
+        return SaveWatcher(on_saved=lambda key, path: self._post_to_ui(self._on_form_saved, key, path))
+
+    @functools.cached_property
+    def form_copier(self):
+        from onboarding.copy_strategies import FormCopier
+        return FormCopier()
+
+    @functools.cached_property
+    def template_cache(self):
+        # None when TEMPLATE_CACHE_MAX_MB is 0: copies are then made from the templates on the share.
+        from onboarding.copy_strategies import TemplateBlobStore
+        max_mb = get_config().template_cache_max_mb
+        return TemplateBlobStore(get_config().template_cache_dir, max_mb * 1024 * 1024) if max_mb else None
+
+    @functools.cached_property
+    def document_launcher(self):
+        from onboarding.opener import DocumentLauncher
+        return DocumentLauncher(on_exit=self._on_viewer_exited)
+
+    @functools.cached_property
+    def template_prefetcher(self):
+        # Separate from form_worker_pool so prefetching never delays a form the user asked for.
+        from concurrent.futures import ThreadPoolExecutor
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="template-prefetch")
+
+    def _start_document_launcher(self):
+        # After the first paint: resolving the opener imports subprocess and searches PATH.
+        opener = self.document_launcher.opener
+        print(f"Opening documents with {opener.name}"
+              f"{' (tracking when viewers close)' if opener.waits_for_viewer else ''}")
+
+    def _start_background_compaction(self):
+        threading.Thread(target=self._run_background_compaction, name="filled-forms-compaction", daemon=True).start()
+
+    def _run_background_compaction(self):
+        # Background thread: archives completed sessions of both forms directories, one after the other.
+        from onboarding.compaction import CompactionJob
+
+        for forms_dir in dict.fromkeys((forms_dir_for_user_type("Parent"), forms_dir_for_user_type("Staff"))):
+            job = CompactionJob(forms_dir / FILLED_FORMS_SUBDIR, min_age_days=get_config().compact_after_days)
+            self.compaction_jobs.append(job)
+            job.run()
+
+    def _ensure_name_entry_screen(self):
+        if not hasattr(self, 'name_entry_frame'):
+            self.name_entry_frame = ctk.CTkFrame(self, fg_color="transparent")
+            self._setup_name_entry_screen()
+
+    def _ensure_main_app_screen(self):
+        if not hasattr(self, 'main_app_frame'):
+            self.main_app_frame = ctk.CTkFrame(self, fg_color="transparent")
+            self.main_app_frame.grid_columnconfigure(0, weight=1)
+            self.main_app_frame.grid_rowconfigure(1, weight=1)
+            self._setup_main_app_ui_elements()
+
     def _setup_user_type_selection_screen(self):
         self.user_type_frame.grid_rowconfigure((0, 6), weight=1)
         self.user_type_frame.grid_rowconfigure((1, 2, 3, 4, 5), weight=0)
         self.user_type_frame.grid_columnconfigure(0, weight=1)
 
-        title_text = f"Welcome to {DAYCARE_NAME_FROM_ENV} Forms"
+        title_text = f"Welcome to {get_config().daycare_name} Forms"
         title_label = ctk.CTkLabel(self.user_type_frame, text=title_text, font=ctk.CTkFont(size=28, weight="bold"))
         title_label.grid(row=1, column=0, padx=20, pady=(20, 10))
 
@@ -151,37 +334,69 @@ class App(ctk.CTk):
     def _reset_user_session_state(self):
         self.current_session_user_name = None
         self.opened_original_forms_for_user.clear()
-        self.user_specific_copied_forms.clear()
+        self.saved_original_forms_for_user.clear()
+        if 'save_watcher' in self.__dict__:
+            self.save_watcher.untrack_all()
         self.all_forms_popup_shown_for_current_user_set = False
+        self.pending_form_opens.clear()
+        self.queued_form_opens.clear()
+        self.open_all_in_flight.clear()
+        self.open_all_opened_count = 0
+        self.forms_list_model.invalidate()
+        self.forms_search_var.set("")
+        self._session_generation += 1
         if hasattr(self, 'name_entry_first_name_entry'):
             self.name_entry_first_name_entry.delete(0, tk.END)
         if hasattr(self, 'name_entry_last_name_entry'):
             self.name_entry_last_name_entry.delete(0, tk.END)
         if hasattr(self, 'display_full_name_label'):
             self.display_full_name_label.configure(text="")
+        if hasattr(self, 'forms_category_menu'):
+            self.forms_category_menu.set(self.ALL_FORM_CATEGORIES)
+
+    def _on_debug_mode_toggled(self, *_):
+        # Spans are only collected while the debug panel is on (or a trace export file is configured).
+        TRACER.enabled = self.debug_mode_var.get() or bool(get_config().trace_export_path)
 
     def _select_user_type(self, user_type_selected):
+        span = TRACER.span("screen:name_entry")
         self.user_type = user_type_selected
-        if self.user_type == "Parent":
-            self.active_forms_directory = ACTUAL_PARENT_FORMS_DIR
-        elif self.user_type == "Staff":
-            self.active_forms_directory = ACTUAL_STAFF_FORMS_DIR
-        else:
+        self.active_forms_directory = forms_dir_for_user_type(self.user_type)
+        if self.active_forms_directory is None:
             messagebox.showerror("Error", "Invalid user type selected.")
             return
 
+        self._ensure_name_entry_screen()
         self._reset_user_session_state()
+        if self.template_cache is not None:
+            self.template_prefetcher.submit(self._prefetch_templates, self.active_forms_directory,
+                                            self._session_generation)
 
         self.user_type_frame.grid_forget()
         self.name_entry_frame.grid(row=0, column=0, sticky="nsew")
-        self.title(f"{APP_NAME} - Enter Name ({self.user_type})")
+        self.title(f"{get_config().app_name} - Enter Name ({self.user_type})")
         self.name_entry_first_name_entry.focus()
+        self.after_idle(span.end)
+
+    def _prefetch_templates(self, forms_directory, generation):
+        # Runs on the prefetch thread while the user types their name; stops once the user goes back.
+        try:
+            forms = self.form_catalog.get(forms_directory)
+        except OSError as e:
+            print(f"Could not list '{forms_directory}' for prefetching: {e}")
+            return
+        with TRACER.span("template_prefetch", forms=len(forms)):
+            self.template_cache.prefetch((path for _, path in forms),
+                                         cancelled=lambda: generation != self._session_generation)
 
     def _go_back_to_user_type_selection(self):
-        self.name_entry_frame.grid_forget()
+        span = TRACER.span("screen:user_type")
+        if hasattr(self, 'name_entry_frame'):
+            self.name_entry_frame.grid_forget()
         self.user_type_frame.grid(row=0, column=0, sticky="nsew")
-        self.title(APP_NAME)
+        self.title(get_config().app_name)
         self._reset_user_session_state()
+        self.after_idle(span.end)
 
     def _submit_name_and_show_forms(self):
         first_name = self.name_entry_first_name_entry.get().strip()
@@ -196,24 +411,73 @@ class App(ctk.CTk):
             self.name_entry_last_name_entry.focus()
             return
 
+        span = TRACER.span("screen:forms")
+        self._ensure_main_app_screen()
         self.current_session_user_name = f"{first_name} {last_name}"
         self.display_full_name_label.configure(text=self.current_session_user_name)
 
         self.name_entry_frame.grid_forget()
         self.main_app_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
-        self.title(f"{APP_NAME} - {self.user_type} ({self.current_session_user_name})")
-        self.header_title_label.configure(text=f"{APP_NAME} ({self.user_type} Forms)")
-        self.forms_list_frame.configure(
-            label_text=f"Available {self.user_type} Forms for {self.current_session_user_name}")
+        app_name = get_config().app_name
+        self.title(f"{app_name} - {self.user_type} ({self.current_session_user_name})")
+        self.header_title_label.configure(text=f"{app_name} ({self.user_type} Forms)")
+        self.forms_list_frame.set_label(f"Available {self.user_type} Forms for {self.current_session_user_name}")
+        self.forms_list_frame.scroll_to_top()
 
         self._update_debug_info_display()
         self.refresh_forms_list()
+        self._restore_opened_forms_from_index()
+        self.after_idle(span.end)
+
+    def _restore_opened_forms_from_index(self):
+        # Resume a session (e.g. after a crash or a restart) from the copies already recorded for this user.
+        future = self.form_worker_pool.submit(self._load_opened_copies,
+                                              self.active_forms_directory / FILLED_FORMS_SUBDIR,
+                                              self.user_type, self.current_session_user_name)
+        generation = self._session_generation
+        future.add_done_callback(lambda f: self._post_to_ui(self._on_opened_copies_loaded, f, generation))
+
+    @staticmethod
+    def _load_opened_copies(filled_forms_path_dir, user_type, user_name):
+        from onboarding.session_index import SESSION_INDEX_FILENAME, STATE_OPENED, STATE_SAVED, SessionIndex
+
+        if not (filled_forms_path_dir / SESSION_INDEX_FILENAME).exists():
+            return []
+        records = SessionIndex.for_directory(filled_forms_path_dir).copies_for_user(user_type, user_name)
+        return [record for record in records
+                if record.state in (STATE_OPENED, STATE_SAVED) and record.copied_path.exists()]
+
+    def _on_opened_copies_loaded(self, future, generation):
+        from onboarding.catalog import CATEGORY_SEPARATOR
+        from onboarding.session_index import STATE_SAVED
+
+        if generation != self._session_generation:
+            return
+        try:
+            records = future.result()
+        except Exception as e:
+            print(f"Could not read session index: {e}")
+            return
+        for record in records:
+            original_form_path_str = os.path.join(self.active_forms_directory,
+                                                  *record.template.split(CATEGORY_SEPARATOR))
+            self.opened_original_forms_for_user.add(original_form_path_str)
+            if record.state == STATE_SAVED:
+                self.saved_original_forms_for_user.add(original_form_path_str)
+            else:
+                self.save_watcher.track((generation, original_form_path_str), record.copied_path,
+                                        record.baseline_hash)
+            self._refresh_form_row(original_form_path_str)
+        if records:
+            print(f"Resumed {len(records)} previously opened form(s) for '{self.current_session_user_name}'")
+            self._check_and_show_all_forms_saved_popup()
+        self._update_debug_info_display()
 
     def _setup_main_app_ui_elements(self):
         self.header_frame = ctk.CTkFrame(self.main_app_frame, corner_radius=0)
         self.header_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
         self.header_frame.grid_columnconfigure(0, weight=1)
-        self.header_title_label = ctk.CTkLabel(self.header_frame, text=APP_NAME,
+        self.header_title_label = ctk.CTkLabel(self.header_frame, text=get_config().app_name,
                                                font=ctk.CTkFont(size=20, weight="bold"))
         self.header_title_label.grid(row=0, column=0, padx=20, pady=(10, 0), sticky="w")
 
@@ -229,10 +493,25 @@ class App(ctk.CTk):
         self.display_full_name_label = ctk.CTkLabel(self.name_display_frame, text="", font=ctk.CTkFont(size=12))
         self.display_full_name_label.grid(row=0, column=1, padx=(0, 5), pady=(5, 5), sticky="w")
 
-        self.forms_list_frame = ctk.CTkScrollableFrame(self.main_app_frame, label_text="Available Forms",
-                                                       label_font=ctk.CTkFont(size=16, weight="bold"))
+        self.forms_search_frame = ctk.CTkFrame(self.header_frame, fg_color="transparent")
+        self.forms_search_frame.grid(row=2, column=0, sticky="ew", padx=20, pady=(0, 10))
+        self.forms_search_frame.grid_columnconfigure(1, weight=1)
+        ctk.CTkLabel(self.forms_search_frame, text="Search:", font=ctk.CTkFont(size=12, weight="bold")).grid(
+            row=0, column=0, padx=(0, 5), sticky="w")
+        self.forms_search_entry = ctk.CTkEntry(self.forms_search_frame, textvariable=self.forms_search_var)
+        self.forms_search_entry.grid(row=0, column=1, sticky="ew")
+        self.forms_search_entry.bind("<Escape>", lambda event: self.forms_search_var.set(""))
+        # Only shown when forms come from more than one subfolder (SCAN_FORM_SUBFOLDERS).
+        self.forms_category_menu = ctk.CTkOptionMenu(self.forms_search_frame, values=[self.ALL_FORM_CATEGORIES],
+                                                     command=self._on_forms_search_changed)
+        self.forms_category_menu.grid(row=0, column=2, padx=(10, 0), sticky="e")
+        self.forms_category_menu.grid_remove()
+
+        self.forms_list_frame = VirtualFormsList(self.main_app_frame, self.forms_list_model,
+                                                 on_activate=self.open_form_for_filling,
+                                                 label_text="Available Forms",
+                                                 label_font=ctk.CTkFont(size=16, weight="bold"))
         self.forms_list_frame.grid(row=1, column=0, sticky="nsew", pady=5)
-        self.forms_list_frame.grid_columnconfigure(0, weight=1)
 
         self.debug_info_display_frame = ctk.CTkFrame(self.main_app_frame, fg_color="transparent")
         self.debug_info_display_frame.grid_columnconfigure(0, weight=1)
@@ -250,18 +529,24 @@ class App(ctk.CTk):
         self.appearance_mode_optionemenu.grid(row=0, column=1, padx=0, pady=10, sticky="w")
         self.appearance_mode_optionemenu.set(ctk.get_appearance_mode())
 
+        self.open_all_button = ctk.CTkButton(self.action_frame, text="Open All Remaining",
+                                             command=self.open_all_remaining_forms)
+        self.open_all_button.grid(row=0, column=2, padx=(0, 10), pady=10, sticky="e")
+
         self.quit_button = ctk.CTkButton(self.action_frame, text="Quit", command=self.destroy, fg_color="transparent",
                                          border_width=2, text_color=("gray10", "#DCE4EE"))
         self.quit_button.grid(row=0, column=3, padx=(0, 20), pady=10, sticky="e")
 
     def _update_debug_info_display(self):
         if self.debug_mode_var.get():
+            forms_dirs = get_forms_dirs()
             debug_text_lines = [
                 f"--- Debug Information ---",
-                f"Daycare Name: {DAYCARE_NAME_FROM_ENV}",
+                f"Daycare Name: {get_config().daycare_name}",
                 f"Script Root: {SCRIPT_ROOT_DIR}",
-                f"Parent Forms Path: {ACTUAL_PARENT_FORMS_DIR} ({PARENT_DIR_SOURCE_MSG.split(': ', 1)[0]})",
-                f"Staff Forms Path: {ACTUAL_STAFF_FORMS_DIR} ({STAFF_DIR_SOURCE_MSG.split(': ', 1)[0]})",
+                f"Parent Forms Path: {forms_dirs.parent_forms_dir} "
+                f"({forms_dirs.parent_dir_source_msg.split(': ', 1)[0]})",
+                f"Staff Forms Path: {forms_dirs.staff_forms_dir} ({forms_dirs.staff_dir_source_msg.split(': ', 1)[0]})",
             ]
             if self.user_type and self.active_forms_directory:
                 debug_text_lines.extend([
@@ -269,11 +554,46 @@ class App(ctk.CTk):
                     f"Active Forms Directory: {self.active_forms_directory}",
                     f"Current Session User Name: {self.current_session_user_name}",
                     f"Opened Original Forms Count: {len(self.opened_original_forms_for_user)}",
+                    f"Saved Forms Count: {len(self.saved_original_forms_for_user)}",
+                    f"Pending Form Opens: {len(self.pending_form_opens)}",
                     f"All Forms Popup Shown: {self.all_forms_popup_shown_for_current_user_set}"
                 ])
             else:
                 debug_text_lines.append("User Type/Active Directory: Not yet set.")
 
+            catalog_stats = self.form_catalog.stats()
+            debug_text_lines.append(
+                f"Form Catalog: {catalog_stats['hits']} hits / {catalog_stats['misses']} misses, "
+                f"{catalog_stats['scans']} scans (last {catalog_stats['last_scan_ms']:.1f} ms, "
+                f"avg {catalog_stats['avg_scan_ms']:.1f} ms), invalidation: {catalog_stats['invalidation']}")
+            for job in self.compaction_jobs:
+                debug_text_lines.append(f"Compaction ({job.filled_forms_dir}): {job.status()}")
+            if 'form_search_index' in self.__dict__:
+                debug_text_lines.append(f"Form Search Index: {len(self.form_search_index)} forms, "
+                                        f"{len(self.form_search_index.categories())} categories")
+            if self.__dict__.get('template_cache') is not None:
+                cache_stats = self.template_cache.stats()
+                debug_text_lines.append(
+                    f"Template Cache: {cache_stats['entries']} files, {cache_stats['bytes'] / 1048576:.1f} of "
+                    f"{get_config().template_cache_max_mb} MB, {cache_stats['hits']} hits / "
+                    f"{cache_stats['misses']} fetches, {cache_stats['evictions']} evictions")
+            if 'document_launcher' in self.__dict__:
+                opener = self.document_launcher.opener
+                debug_text_lines.append(
+                    f"Viewer Launcher: {opener.name} ({'tracks' if opener.waits_for_viewer else 'cannot track'} "
+                    f"closing), {self.document_launcher.launches} launched, "
+                    f"{self.document_launcher.running_count()} running, {len(self.queued_form_opens)} queued")
+            if 'save_watcher' in self.__dict__:
+                debug_text_lines.append(f"Save Watcher: {self.save_watcher.mode}, "
+                                        f"{self.save_watcher.tracked_count()} copies awaiting a save")
+            trace_summaries = TRACER.summaries()
+            if trace_summaries:
+                debug_text_lines.append(f"Latency (last {TRACER.histogram_size} calls per operation):")
+            for operation, summary in trace_summaries.items():
+                debug_text_lines.append(
+                    f"  {operation}: n={summary['count']} p50={summary['p50_ms']:.1f} ms "
+                    f"p95={summary['p95_ms']:.1f} ms max={summary['max_ms']:.1f} ms")
+
             self.debug_info_label.configure(text="\n".join(debug_text_lines))
             self.debug_info_display_frame.grid(row=2, column=0, sticky="ew", pady=(5, 5), padx=0)
             if not self.debug_info_label.winfo_ismapped():
@@ -282,148 +602,342 @@ class App(ctk.CTk):
             self.debug_info_label.pack_forget()
             self.debug_info_display_frame.grid_forget()
 
+    def _form_row_text(self, form_name, original_form_path_str):
+        if original_form_path_str in self.pending_form_opens:
+            return f"{form_name}  (opening…)", False
+        if original_form_path_str in self.saved_original_forms_for_user:
+            return f"{form_name}  ✓ saved", True
+        if original_form_path_str in self.opened_original_forms_for_user:
+            return f"{form_name}  (opened, not saved yet)", True
+        return form_name, True
+
+    def _show_forms_list_message(self, text):
+        self.forms_list_model.clear()
+        self.forms_list_frame.show_message(text)
+
     def refresh_forms_list(self):
-        for widget in self.forms_list_frame.winfo_children():
-            widget.destroy()
+        with TRACER.span("refresh_forms_list"):
+            self._refresh_forms_list()
+
+    def _refresh_forms_list(self):
         self.available_forms = []
 
         if not self.active_forms_directory:
+            self._show_forms_list_message("")
             if self.user_type:
                 messagebox.showerror("Error", "Forms directory not set.")
             return
 
-        if not self.active_forms_directory.is_dir():
+        try:
+            self.available_forms = list(self.form_catalog.get(self.active_forms_directory))
+            if self.available_forms:
+                self.form_search_index.sync(self.available_forms)
+                self._update_forms_category_menu()
+                self._show_filtered_forms()
+            else:
+                self._show_forms_list_message(
+                    f"No {self.user_type.lower()} forms found in '{self.active_forms_directory.name}'.")
+        except (FileNotFoundError, NotADirectoryError):
             messagebox.showwarning("Forms Directory Not Found",
                                    f"Directory for {self.user_type} not found:\n'{self.active_forms_directory}'")
-            ctk.CTkLabel(self.forms_list_frame, text=f"{self.user_type} forms directory not found.").pack(pady=10,
-                                                                                                          padx=10)
-            return
-
-        try:
-            found_any = False
-            sorted_items = sorted(self.active_forms_directory.iterdir(), key=lambda p: p.name.lower())
-            for item in sorted_items:
-                if item.is_file() and item.suffix.lower() in ['.pdf', '.docx', '.doc']:
-                    form_name = item.name
-                    original_form_path_str = str(item)
-                    self.available_forms.append((form_name, original_form_path_str))
-
-                    display_text = form_name
-                    if original_form_path_str in self.opened_original_forms_for_user:
-                        display_text += "  ✓"
-
-                    form_button = ctk.CTkButton(
-                        self.forms_list_frame, text=display_text,
-                        command=lambda p=original_form_path_str, n=form_name: self.open_form_for_filling(p, n),
-                        anchor="w"
-                    )
-                    form_button.pack(pady=(2, 3), padx=10, fill="x")
-                    found_any = True
-            if not found_any:
-                ctk.CTkLabel(self.forms_list_frame,
-                             text=f"No {self.user_type.lower()} forms found in '{self.active_forms_directory.name}'.").pack(
-                    pady=10, padx=10)
+            self._show_forms_list_message(f"{self.user_type} forms directory not found.")
         except Exception as e:
             messagebox.showerror("Error Reading Forms", f"Error reading forms: {e}")
-            ctk.CTkLabel(self.forms_list_frame, text="Error loading forms.").pack(pady=10, padx=10)
+            self._show_forms_list_message("Error loading forms.")
         self._update_debug_info_display()
 
-    def _check_and_show_all_forms_opened_popup(self):
+    def _update_forms_category_menu(self):
+        categories = self.form_search_index.categories()
+        if len(categories) < 2:
+            self.forms_category_menu.set(self.ALL_FORM_CATEGORIES)
+            self.forms_category_menu.grid_remove()
+            return
+        labels = [category or self.TOP_LEVEL_FORM_CATEGORY for category in categories]
+        self.forms_category_menu.configure(values=[self.ALL_FORM_CATEGORIES] + labels)
+        if self.forms_category_menu.get() not in labels:
+            self.forms_category_menu.set(self.ALL_FORM_CATEGORIES)
+        self.forms_category_menu.grid()
+
+    def _selected_forms_category(self):
+        label = self.forms_category_menu.get()
+        if label == self.ALL_FORM_CATEGORIES:
+            return None
+        return "" if label == self.TOP_LEVEL_FORM_CATEGORY else label
+
+    def _on_forms_search_changed(self, *_):
+        # Fires on every keystroke; filter once the pending key events have been handled.
+        if not self._forms_search_pending:
+            self._forms_search_pending = True
+            self.after_idle(self._apply_forms_search)
+
+    def _apply_forms_search(self):
+        self._forms_search_pending = False
+        if self.current_session_user_name and self.available_forms:
+            self.forms_list_frame.scroll_to_top()
+            self._show_filtered_forms(always_render=True)
+
+    def _show_filtered_forms(self, always_render=False):
+        # The list widgets are pooled (VirtualFormsList), so filtering only rebinds the visible rows.
+        query = self.forms_search_var.get()
+        with TRACER.span("filter_forms"):
+            visible_forms = self.form_search_index.search(query, self._selected_forms_category())
+            if visible_forms:
+                structure_changed, changed = self.forms_list_model.update(visible_forms)
+                if structure_changed or changed or always_render:
+                    self.forms_list_frame.render()
+        if not visible_forms:
+            self._show_forms_list_message(f"No forms match '{query.strip()}'.")
+
+    def _post_to_ui(self, callback, *args):
+        # Safe to call from worker threads: Tk queues after() calls onto the thread running mainloop().
+        try:
+            self.after(0, callback, *args)
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def _on_catalog_changed(self, directory):
+        if (self.current_session_user_name and self.active_forms_directory
+                and str(self.active_forms_directory) == directory):
+            self.refresh_forms_list()
+
+    def _check_and_show_all_forms_saved_popup(self):
         if self.all_forms_popup_shown_for_current_user_set:
             return
-        if self.available_forms and len(self.opened_original_forms_for_user) == len(self.available_forms):
+        if self.available_forms and all(original_form_path_str in self.saved_original_forms_for_user
+                                        for _, original_form_path_str in self.available_forms):
             messagebox.showinfo("All Forms Processed",
-                                f"All forms have been opened for {self.current_session_user_name}.\n\n"
-                                "Once done with all forms, please return laptop to office staff.")
+                                f"All forms have been saved for {self.current_session_user_name}.\n\n"
+                                "Please return laptop to office staff.")
             self.all_forms_popup_shown_for_current_user_set = True
             self._update_debug_info_display()
 
+    def _refresh_form_row(self, original_form_path_str):
+        if self.forms_list_model.refresh_row(original_form_path_str):
+            self.forms_list_frame.render()
+
     def open_form_for_filling(self, original_form_path_str, form_name):
         if not self.current_session_user_name:
             messagebox.showerror("Error", "User name not set. Please restart the selection process.")
             self._go_back_to_user_type_selection()
             return
 
-        if not self.active_forms_directory or not self.active_forms_directory.is_dir():
+        if not self.active_forms_directory:
             messagebox.showerror("Error", f"Active forms directory for {self.user_type} is not valid.")
             return
 
-        filled_forms_path_dir = self.active_forms_directory / FILLED_FORMS_SUBDIR
-        filled_forms_path_dir.mkdir(parents=True, exist_ok=True)
-        base, ext = os.path.splitext(form_name)
-        safe_user_name = "".join(
-            c if c.isalnum() or c in " _-" else "_" for c in self.current_session_user_name)
-
-        # Use datetime from the datetime module, not ctk
-        timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-        copied_form_name = f"{base}_{self.user_type}_{safe_user_name}_{timestamp_str}{ext}"
-        target_copied_form_path = filled_forms_path_dir / copied_form_name
-
-        path_to_open = None
-        opened_existing = False
-
-        if original_form_path_str in self.user_specific_copied_forms:
-            existing_copied_path = self.user_specific_copied_forms[original_form_path_str]
-            if existing_copied_path == target_copied_form_path and existing_copied_path.exists():
-                path_to_open = existing_copied_path
-                opened_existing = True
-                print(f"Reopening existing file for '{self.current_session_user_name}': {path_to_open}")
-            else:
-                print(
-                    f"Recorded path {existing_copied_path} for '{original_form_path_str}' "
-                    f"is invalid or non-existent for user '{self.current_session_user_name}'. "
-                    f"Will attempt to create a new copy."
-                )
-                del self.user_specific_copied_forms[original_form_path_str]
-
-        if not path_to_open:
-            try:
-                shutil.copy2(original_form_path_str, target_copied_form_path)
-                self.user_specific_copied_forms[original_form_path_str] = target_copied_form_path
-                path_to_open = target_copied_form_path
-                print(f"Copied new file to: {path_to_open} for user '{self.current_session_user_name}'")
-            except FileNotFoundError:
-                messagebox.showerror("Error", f"Original form not found: {original_form_path_str}")
-                self._update_debug_info_display()
-                return
-            except Exception as e:
-                messagebox.showerror("Error Copying Form", f"Could not copy form: {e}")
-                self._update_debug_info_display()
-                return
+        if original_form_path_str in self.pending_form_opens:
+            return
+        self.pending_form_opens.add(original_form_path_str)
+        self._refresh_form_row(original_form_path_str)
+
+        generation = self._session_generation
+        future = self.form_worker_pool.submit(
+            self._copy_and_launch_form, self.form_copier, self.template_cache, self.save_watcher,
+            self.document_launcher, (generation, original_form_path_str), original_form_path_str, form_name,
+            self.active_forms_directory, self.user_type, self.current_session_user_name)
+        future.add_done_callback(lambda f: self._post_to_ui(
+            self._on_form_open_finished, f, generation, original_form_path_str, form_name))
+        self._update_debug_info_display()
 
+    @staticmethod
+    def _copy_and_launch_form(form_copier, template_cache, save_watcher, document_launcher, launch_key,
+                              original_form_path_str, form_name, active_forms_directory, user_type, user_name):
+        # Runs on the worker pool: no Tk calls in here.
+        from onboarding.forms_core import prepare_form_copy
+        from onboarding.session_index import STATE_CREATED, STATE_OPENED, STATE_SAVED, SessionIndex
+
+        form_copy = prepare_form_copy(form_copier, original_form_path_str, form_name, active_forms_directory,
+                                      user_type, user_name, template_cache)
+        # Tracked before the viewer starts: a viewer closed (or crashed) at once must not find it untracked, which
+        # check_now() takes as already saved.
+        if form_copy.state != STATE_SAVED:
+            save_watcher.track(launch_key, form_copy.path, form_copy.baseline_hash)
         try:
-            if platform.system() == 'Darwin':
-                subprocess.call(('open', str(path_to_open)))
-            elif platform.system() == 'Windows':
-                os.startfile(str(path_to_open))
-            else:
-                subprocess.call(('xdg-open', str(path_to_open)))
+            document_launcher.launch(form_copy.path, launch_key)
+        except Exception:
+            save_watcher.untrack(form_copy.path)
+            raise
+        if form_copy.state == STATE_CREATED:
+            SessionIndex.for_directory(form_copy.path.parent).set_state(user_type, user_name, form_name,
+                                                                        form_copy.template_version, STATE_OPENED)
+        return form_copy
+
+    def _on_form_open_finished(self, future, generation, original_form_path_str, form_name):
+        from onboarding.opener import ViewerLaunchError
+        from onboarding.session_index import STATE_SAVED
+
+        if generation != self._session_generation:
+            if future.exception() is None:  # tracked by the worker after the session was reset
+                self.save_watcher.untrack(future.result().path)
+            return
+        self.pending_form_opens.discard(original_form_path_str)
+        self._refresh_form_row(original_form_path_str)
+        opened_by_open_all = original_form_path_str in self.open_all_in_flight
+        self.open_all_in_flight.discard(original_form_path_str)
+        self._open_next_queued_forms()
 
-            self.opened_original_forms_for_user.add(original_form_path_str)
-            if not opened_existing:
-                self.refresh_forms_list()
+        try:
+            form_copy = future.result()
+        except NotADirectoryError:
+            messagebox.showerror("Error", f"Active forms directory for {self.user_type} is not valid.")
+            self._update_debug_info_display()
+            return
+        except FileNotFoundError:
+            messagebox.showerror("Error", f"Original form not found: {original_form_path_str}")
+            self._update_debug_info_display()
+            return
+        except ViewerLaunchError as e:
+            messagebox.showerror("Error Opening Form", f"Could not open file '{e.path.name}': {e.cause}")
+            self._update_debug_info_display()
+            return
+        except Exception as e:
+            messagebox.showerror("Error Copying Form", f"Could not copy form: {e}")
+            self._update_debug_info_display()
+            return
 
-            if opened_existing:
-                messagebox.showinfo("Form Reopened",
-                                    f"Existing copy of '{form_name}' for '{self.current_session_user_name}' reopened.\n\n"
-                                    "Please continue filling it out and SAVE IT.")
-            else:
-                messagebox.showinfo("Form Ready",
-                                    f"New copy of '{form_name}' created and opened for '{self.current_session_user_name}'.\n\n"
-                                    "Please fill it out and SAVE IT.")
+        self.opened_original_forms_for_user.add(original_form_path_str)
+        if form_copy.state == STATE_SAVED:
+            self.saved_original_forms_for_user.add(original_form_path_str)
+        self._refresh_form_row(original_form_path_str)
+
+        if opened_by_open_all:
+            self.open_all_opened_count += 1
+            if not self.open_all_in_flight and not self.queued_form_opens:
+                messagebox.showinfo("Forms Ready",
+                                    f"{self.open_all_opened_count} forms opened for "
+                                    f"'{self.current_session_user_name}'.\n\n"
+                                    "Please fill out each one and SAVE IT.")
+        elif form_copy.opened_existing:
+            messagebox.showinfo("Form Reopened",
+                                f"Existing copy of '{form_name}' for '{self.current_session_user_name}' reopened.\n\n"
+                                "Please continue filling it out and SAVE IT.")
+        else:
+            messagebox.showinfo("Form Ready",
+                                f"New copy of '{form_name}' created and opened for '{self.current_session_user_name}'.\n\n"
+                                "Please fill it out and SAVE IT.")
 
-            self._check_and_show_all_forms_opened_popup()
+        self._check_and_show_all_forms_saved_popup()
+        self._update_debug_info_display()
 
-        except Exception as e:
-            messagebox.showerror("Error Opening Form", f"Could not open file '{path_to_open.name}': {e}")
+    def open_all_remaining_forms(self):
+        remaining = [(form_name, path) for form_name, path in self.available_forms
+                     if path not in self.opened_original_forms_for_user and path not in self.pending_form_opens]
+        if not remaining:
+            messagebox.showinfo("Nothing to Open", "Every form has already been opened.")
+            return
+        self.queued_form_opens = remaining
+        self.open_all_opened_count = 0
+        self._open_next_queued_forms()
+
+    def _open_next_queued_forms(self):
+        # At most OPEN_ALL_CONCURRENCY queued forms are copied and launched at a time, so a large packet neither
+        # starts a storm of viewers nor keeps the worker pool from a form the user clicks meanwhile.
+        while self.queued_form_opens and len(self.open_all_in_flight) < self.OPEN_ALL_CONCURRENCY:
+            form_name, path = self.queued_form_opens.pop(0)
+            if path in self.opened_original_forms_for_user or path in self.pending_form_opens:
+                continue
+            self.open_all_in_flight.add(path)
+            self.open_form_for_filling(path, form_name)
+            if path not in self.pending_form_opens:  # refused, e.g. the forms directory went away
+                self.open_all_in_flight.discard(path)
+                self.queued_form_opens.clear()
+
+    def _on_viewer_exited(self, key, copied_path, returncode):
+        # Launcher thread. A save made just before the viewer closed may not have been seen yet, so check now.
+        saved = 'save_watcher' not in self.__dict__ or self.save_watcher.check_now(copied_path)
+        self._post_to_ui(self._on_viewer_closed, key, copied_path, returncode, saved)
+
+    def _on_viewer_closed(self, key, copied_path, returncode, saved):
+        generation, original_form_path_str = key
+        if generation != self._session_generation:
+            return
+        opener = self.document_launcher.opener
+        if returncode:
+            messagebox.showerror("Error Opening Form", f"Could not open '{os.path.basename(copied_path)}': "
+                                                       f"{opener.name} exited with code {returncode}.")
+            return
+        # The platform opener only hands the document over, so its exit says nothing about the viewer window.
+        if not opener.waits_for_viewer or saved or original_form_path_str in self.saved_original_forms_for_user:
+            return
+        form_name = next((name for name, path in self.available_forms if path == original_form_path_str),
+                         os.path.basename(original_form_path_str))
+        if messagebox.askyesno("Did You Save?",
+                               f"The viewer for '{form_name}' was closed, but no saved changes were found.\n\n"
+                               "Reopen it to finish filling it out and SAVE IT?"):
+            self.open_form_for_filling(original_form_path_str, form_name)
+
+    @staticmethod
+    def _mark_copy_saved(copied_path):
+        from onboarding.session_index import STATE_SAVED, SessionIndex
+
+        SessionIndex.for_directory(os.path.dirname(copied_path)).set_state_for_copy(copied_path, STATE_SAVED)
 
+    def _on_form_saved(self, key, copied_path):
+        generation, original_form_path_str = key
+        if generation != self._session_generation:
+            return
+        print(f"Detected saved copy for '{self.current_session_user_name}': {copied_path}")
+        self.saved_original_forms_for_user.add(original_form_path_str)
+        self._refresh_form_row(original_form_path_str)
+        self.form_worker_pool.submit(self._mark_copy_saved, copied_path)
+        self._check_and_show_all_forms_saved_popup()
         self._update_debug_info_display()
 
+    def destroy(self):
+        self._session_generation += 1  # stops a running template prefetch after its current file
+        for job in self.compaction_jobs:
+            job.cancel()
+        if 'form_worker_pool' in self.__dict__:
+            self.form_worker_pool.shutdown(wait=False, cancel_futures=True)
+        if 'document_launcher' in self.__dict__:
+            self.document_launcher.on_exit = None
+        if 'template_prefetcher' in self.__dict__:
+            self.template_prefetcher.shutdown(wait=False, cancel_futures=True)
+        if 'form_catalog' in self.__dict__:
+            self.form_catalog.close()
+        if 'save_watcher' in self.__dict__:
+            self.save_watcher.close()
+        super().destroy()
+
     @staticmethod
     def change_appearance_mode_event(new_appearance_mode: str):
         ctk.set_appearance_mode(new_appearance_mode)
 
 
-if __name__ == "__main__":
+def _report_startup_profile(app, app_started_t):
+    app.update()  # process the pending map/expose events so the user type screen is actually painted
+    painted_t = time.perf_counter()
+    print("--- Startup Profile ---")
+    print(f"Imports:            {(_IMPORTS_DONE_T - _STARTUP_T0) * 1000:8.1f} ms")
+    print(f"App construction:   {(painted_t - app_started_t) * 1000:8.1f} ms (including first paint)")
+    print(f"Time to first paint:{(painted_t - _STARTUP_T0) * 1000:8.1f} ms since onboard.py started executing")
+    print("For a per-module import breakdown run: python -X importtime onboard.py --profile-startup")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daycare onboarding forms kiosk.")
+    parser.add_argument("--batch", nargs=argparse.REMAINDER, metavar="ARGS",
+                        help="generate packets headlessly from a roster CSV (see: python -m onboarding.batch -h)")
+    parser.add_argument("--review", nargs=argparse.REMAINDER, metavar="ARGS",
+                        help="report missing forms or this week's families (see: python -m onboarding.review -h)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import and time-to-first-paint timings for the user type screen")
+    args = parser.parse_args(argv)
+
+    if args.batch is not None:
+        from onboarding import batch
+        return batch.main(args.batch)
+    if args.review is not None:
+        from onboarding import review
+        return review.main(args.review)
+
+    app_started_t = time.perf_counter()
     app = App()
+    if args.profile_startup:
+        _report_startup_profile(app, app_started_t)
     app.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""GUI-free helpers used by onboard.py."""
@@ -0,0 +1,144 @@
+"""Headless batch packet generation.
+
+Pre-stages every form for each person in a roster CSV into Filled_Forms, exactly as the app would name them:
+
+    python -m onboarding.batch roster.csv [--workers 8] [--processes]
+    python onboard.py --batch roster.csv ...
+
+The CSV has one (user_type, first, last) row per person; a header row is optional.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+
+from onboarding.catalog import scan_forms
+from onboarding.config import forms_dir_for_user_type, get_config
+from onboarding.copy_strategies import FormCopier
+from onboarding.forms_core import prepare_form_copy
+
+USER_TYPES = ("Parent", "Staff")
+
+_form_copier = None
+
+
+class BatchReport(NamedTuple):
+    created: int
+    reused: int
+    failures: list
+    bytes_copied: int
+    bytes_written: int
+    elapsed: float
+
+    @property
+    def files_per_second(self):
+        return (self.created + self.reused) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_second(self):
+        return self.bytes_copied / 1024 / 1024 / self.elapsed if self.elapsed else 0.0
+
+
+def read_roster(csv_path):
+    """Return unique (user_type, user_name) pairs from a roster CSV, in file order."""
+    roster = []
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for line_number, row in enumerate(csv.reader(f), start=1):
+            cells = [cell.strip() for cell in row]
+            if not any(cells):
+                continue
+            if line_number == 1 and cells[0].lower() in ("user_type", "type", "user type"):
+                continue
+            if len(cells) < 3 or not cells[1] or not cells[2]:
+                raise ValueError(f"{csv_path}:{line_number}: expected user_type, first name, last name")
+            user_type = cells[0].capitalize()
+            if user_type not in USER_TYPES:
+                raise ValueError(f"{csv_path}:{line_number}: user type must be Parent or Staff, got '{cells[0]}'")
+            entry = (user_type, f"{cells[1]} {cells[2]}")
+            if entry not in roster:
+                roster.append(entry)
+    return roster
+
+
+def plan_jobs(roster, forms_dir_for=forms_dir_for_user_type):
+    """Expand a roster into one (template_path, form_name, forms_dir, user_type, user_name) job per form."""
+    forms_by_type = {}
+    jobs = []
+    for user_type, user_name in roster:
+        if user_type not in forms_by_type:
+            forms_dir = Path(forms_dir_for(user_type))
+            forms_by_type[user_type] = (forms_dir, scan_forms(forms_dir, get_config().scan_subfolders))
+        forms_dir, forms = forms_by_type[user_type]
+        jobs.extend((form_path, form_name, forms_dir, user_type, user_name) for form_name, form_path in forms)
+    return jobs
+
+
+def _run_job(job):
+    global _form_copier
+    if _form_copier is None:
+        _form_copier = FormCopier()
+    form_copy = prepare_form_copy(_form_copier, *job)
+    bytes_written = form_copy.copy_result.bytes_written if form_copy.copy_result else 0
+    return form_copy.opened_existing, os.path.getsize(form_copy.path), bytes_written
+
+
+def generate_packets(roster, workers=None, use_processes=False, forms_dir_for=forms_dir_for_user_type):
+    jobs = plan_jobs(roster, forms_dir_for)
+    created = reused = bytes_copied = bytes_written = 0
+    failures = []
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    start = time.perf_counter()
+    with executor_class(max_workers=workers) as executor:
+        futures = {executor.submit(_run_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                opened_existing, size, written = future.result()
+            except Exception as e:
+                form_path, _, _, user_type, user_name = futures[future]
+                failures.append((user_type, user_name, form_path, str(e)))
+                continue
+            if opened_existing:
+                reused += 1
+            else:
+                created += 1
+                bytes_copied += size
+                bytes_written += written
+    return BatchReport(created, reused, failures, bytes_copied, bytes_written, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="onboarding.batch", description=__doc__.splitlines()[0])
+    parser.add_argument("roster", help="CSV of user_type, first name, last name")
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: executor default)")
+    parser.add_argument("--processes", action="store_true", help="use a process pool instead of threads")
+    parser.add_argument("--parent-dir", type=Path, default=None, help="override PARENT_FORMS_DIR")
+    parser.add_argument("--staff-dir", type=Path, default=None, help="override STAFF_FORMS_DIR")
+    args = parser.parse_args(argv)
+
+    overrides = {"Parent": args.parent_dir, "Staff": args.staff_dir}
+
+    def forms_dir_for(user_type):
+        return overrides[user_type] or forms_dir_for_user_type(user_type)
+
+    try:
+        roster = read_roster(args.roster)
+    except (OSError, ValueError) as e:
+        print(f"Could not read roster: {e}", file=sys.stderr)
+        return 2
+
+    report = generate_packets(roster, args.workers, args.processes, forms_dir_for)
+    print(f"Roster: {len(roster)} people. Created {report.created} copies, reused {report.reused}, "
+          f"{len(report.failures)} failed in {report.elapsed:.2f} s")
+    print(f"Throughput: {report.files_per_second:.1f} files/s, {report.mb_per_second:.1f} MB/s "
+          f"({report.bytes_written / 1024 / 1024:.1f} MB actually written)")
+    for user_type, user_name, form_path, error in report.failures:
+        print(f"  FAILED {user_type} '{user_name}': {form_path}: {error}", file=sys.stderr)
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import os
+import threading
+import time
+
+from onboarding.config import FILLED_FORMS_SUBDIR
+from onboarding.fs_watch import IN_ISDIR, InotifyWatcher
+
+FORM_EXTENSIONS = ('.pdf', '.docx', '.doc')
+CATEGORY_SEPARATOR = "/"
+
+
+def _scan_tree(directory, recursive):
+    directory = os.fspath(directory)
+    forms = []
+    directory_mtimes = {directory: os.stat(directory).st_mtime_ns}
+    pending = [(directory, "")]
+    while pending:
+        path, prefix = pending.pop()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if os.path.splitext(entry.name)[1].lower() in FORM_EXTENSIONS and entry.is_file():
+                        forms.append((prefix + entry.name, entry.path))
+                    elif (recursive and entry.name != FILLED_FORMS_SUBDIR and not entry.name.startswith(".")
+                          and entry.is_dir(follow_symlinks=False)):
+                        directory_mtimes[entry.path] = entry.stat(follow_symlinks=False).st_mtime_ns
+                        pending.append((entry.path, f"{prefix}{entry.name}{CATEGORY_SEPARATOR}"))
+        except OSError:
+            if path == directory:
+                raise
+            print(f"Skipping unreadable forms subfolder: {path}")
+    forms.sort(key=lambda form: form[0].lower())
+    return forms, directory_mtimes
+
+
+def scan_forms(directory, recursive=False):
+    """Return sorted (form_name, form_path) pairs for the form files in `directory`.
+
+    With `recursive`, subfolders (except Filled_Forms and hidden ones) are scanned too and their forms are named
+    by their path relative to `directory`, e.g. "Medical/Allergy Plan.pdf": the subfolder is the form's category.
+    """
+    return _scan_tree(directory, recursive)[0]
+
+
+def form_category(form_name):
+    """The subfolder part of a form name from a recursive scan, or "" for forms at the top level."""
+    return form_name.rpartition(CATEGORY_SEPARATOR)[0]
+
+
+class _CachedListing:
+    __slots__ = ("forms", "directory_mtimes", "checked_at", "dirty")
+
+    def __init__(self, forms, directory_mtimes):
+        self.forms = forms
+        self.directory_mtimes = directory_mtimes
+        self.checked_at = time.monotonic()
+        self.dirty = False
+
+
+class FormCatalog:
+    """Caches the filtered, sorted form listing of each forms directory.
+
+    `get()` answers from the cache straight away and, at most every `revalidate_interval` seconds, re-checks
+    the directory mtime on a background thread (stale-while-revalidate). Where inotify is available it also
+    marks a listing dirty as soon as the directory changes. When a background check finds a different listing,
+    `on_change(directory)` is called from that background thread.
+
+    With `recursive`, listings include subfolders (see scan_forms) and every scanned folder is checked/watched.
+    """
+
+    def __init__(self, on_change=None, revalidate_interval=2.0, use_inotify=True, recursive=False):
+        self.on_change = on_change
+        self.revalidate_interval = revalidate_interval
+        self.recursive = recursive
+        self._lock = threading.Lock()
+        self._listings = {}
+        self._revalidating = set()
+        self._watched = {}  # watched folder -> the listing (top-level directory) it belongs to
+        self._watcher = InotifyWatcher.create(self._on_watch_event) if use_inotify else None
+
+        self.hits = 0
+        self.misses = 0
+        self.scans = 0
+        self.last_scan_ms = 0.0
+        self.total_scan_ms = 0.0
+
+    @property
+    def invalidation_mode(self):
+        return "inotify + mtime" if self._watcher else "mtime"
+
+    def get(self, directory):
+        """Return the cached listing for `directory`, scanning synchronously only on a cold cache.
+
+        Raises OSError (e.g. FileNotFoundError) when the directory cannot be listed.
+        """
+        key = str(directory)
+        with self._lock:
+            listing = self._listings.get(key)
+            if listing is not None:
+                self.hits += 1
+                stale = listing.dirty or time.monotonic() - listing.checked_at >= self.revalidate_interval
+                if stale and key not in self._revalidating:
+                    self._revalidating.add(key)
+                    threading.Thread(target=self._revalidate, args=(key,), name="form-catalog-revalidate",
+                                     daemon=True).start()
+                return listing.forms
+            self.misses += 1
+
+        listing = self._scan(key)
+        with self._lock:
+            self._listings[key] = listing
+        self._watch(key, listing, None)
+        return listing.forms
+
+    def invalidate(self, directory=None):
+        with self._lock:
+            if directory is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(str(directory), None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "scans": self.scans,
+                "last_scan_ms": self.last_scan_ms,
+                "avg_scan_ms": self.total_scan_ms / self.scans if self.scans else 0.0,
+                "directories": len(self._listings),
+                "invalidation": self.invalidation_mode,
+            }
+
+    def close(self):
+        if self._watcher:
+            self._watcher.close()
+            self._watcher = None
+
+    def _scan(self, key):
+        start = time.perf_counter()
+        forms, directory_mtimes = _scan_tree(key, self.recursive)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.scans += 1
+            self.last_scan_ms = elapsed_ms
+            self.total_scan_ms += elapsed_ms
+        return _CachedListing(forms, directory_mtimes)
+
+    def _watch(self, key, listing, previous):
+        if not self._watcher:
+            return
+        for folder in listing.directory_mtimes:
+            with self._lock:
+                self._watched[folder] = key
+            self._watcher.watch(folder)
+        for folder in (previous.directory_mtimes if previous else ()):
+            if folder not in listing.directory_mtimes:
+                with self._lock:
+                    if self._watched.get(folder) != key:
+                        continue
+                    del self._watched[folder]
+                self._watcher.unwatch(folder)
+
+    @staticmethod
+    def _unchanged(key, listing):
+        """Whether no scanned folder changed. Raises OSError when the top-level directory is gone."""
+        if listing.dirty:
+            return False
+        for folder, mtime_ns in listing.directory_mtimes.items():
+            try:
+                if os.stat(folder).st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                if folder == key:
+                    raise
+                return False
+        return True
+
+    def _revalidate(self, key):
+        changed = False
+        try:
+            with self._lock:
+                listing = self._listings.get(key)
+            if listing is None:
+                return
+            try:
+                unchanged = self._unchanged(key, listing)
+            except OSError:
+                with self._lock:
+                    self._listings.pop(key, None)
+                changed = True
+                return
+            if unchanged:
+                listing.checked_at = time.monotonic()
+                return
+            try:
+                fresh = self._scan(key)
+            except OSError:
+                with self._lock:
+                    self._listings.pop(key, None)
+                changed = True
+                return
+            with self._lock:
+                self._listings[key] = fresh
+            self._watch(key, fresh, listing)
+            changed = fresh.forms != listing.forms
+        finally:
+            with self._lock:
+                self._revalidating.discard(key)
+            if changed and self.on_change:
+                self.on_change(key)
+
+    def _on_watch_event(self, directory, name, mask):
+        with self._lock:
+            key = self._watched.get(directory, directory)
+            listing = self._listings.get(key)
+            if listing is None:
+                return
+            if name and os.path.splitext(name)[1].lower() not in FORM_EXTENSIONS and not (
+                    self.recursive and mask & IN_ISDIR):
+                return
+            listing.dirty = True
+            start_revalidation = key not in self._revalidating
+            if start_revalidation:
+                self._revalidating.add(key)
+        if start_revalidation:
+            threading.Thread(target=self._revalidate, args=(key,), name="form-catalog-revalidate",
+                             daemon=True).start()
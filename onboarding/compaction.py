@@ -0,0 +1,343 @@
+"""Archive completed sessions out of the flat Filled_Forms directory.
+
+Copies older than a cut-off are grouped by (user_type, safe_user_name, date), parsed from their file names, and
+streamed into one ZIP per session (or moved into sharded sub-directories). A SQLite manifest records where every
+file went so single files can be found and restored without opening every archive:
+
+    python -m onboarding.compaction /path/to/Filled_Forms --min-age-days 30 [--mode shard]
+    python -m onboarding.compaction /path/to/Filled_Forms --restore "Enrollment_Parent_Jane Doe_20260912_101500.pdf"
+"""
+import argparse
+import itertools
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import zipfile
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+from onboarding.forms_core import parse_copied_form_name
+
+ARCHIVE_DIRNAME = "Archive"
+MANIFEST_FILENAME = "manifest.sqlite3"
+LOCK_FILENAME = ".compaction.lock"
+STALE_LOCK_SECONDS = 6 * 60 * 60
+
+MODE_ZIP = "zip"
+MODE_SHARD = "shard"
+
+_MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    name TEXT PRIMARY KEY,
+    user_type TEXT NOT NULL,
+    safe_user_name TEXT NOT NULL,
+    session_date TEXT NOT NULL,
+    archive TEXT NOT NULL,
+    member TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    archived_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_user ON entries (user_type, safe_user_name);
+CREATE INDEX IF NOT EXISTS entries_by_date ON entries (session_date);
+"""
+
+
+class ArchivedForm(NamedTuple):
+    name: str
+    user_type: str
+    safe_user_name: str
+    session_date: str
+    archive: str
+    member: str
+    size: int
+    mtime_ns: int
+    archived_at: str
+
+
+class ArchiveManifest:
+    def __init__(self, archive_dir):
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.archive_dir / MANIFEST_FILENAME), timeout=30)
+        self._conn.executescript(_MANIFEST_SCHEMA)
+
+    def add_many(self, entries):
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", entries)
+
+    def remove(self, name):
+        with self._conn:
+            self._conn.execute("DELETE FROM entries WHERE name = ?", (name,))
+
+    def lookup(self, name):
+        row = self._conn.execute("SELECT * FROM entries WHERE name = ?", (name,)).fetchone()
+        return ArchivedForm(*row) if row else None
+
+    def entries_for_user(self, user_type, safe_user_name):
+        rows = self._conn.execute("SELECT * FROM entries WHERE user_type = ? AND safe_user_name = ? ORDER BY name",
+                                  (user_type, safe_user_name)).fetchall()
+        return [ArchivedForm(*row) for row in rows]
+
+    def close(self):
+        self._conn.close()
+
+
+def _archive_relpath(user_type, safe_user_name, session_date, mode):
+    if mode == MODE_ZIP:
+        return os.path.join(user_type, session_date[:4], f"{session_date}_{safe_user_name}.zip")
+    return os.path.join(user_type, session_date[:6], f"{session_date}_{safe_user_name}")
+
+
+def _file_crc32(path):
+    crc = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def _zip_member_for(zf, name, path, size):
+    """The member to archive `path` as, and whether it still has to be written.
+
+    A member already holding the same bytes (left by an interrupted run) is reused. One holding other bytes, such as
+    the copy as it was before being restored and edited, is left alone and the file goes in under a new member name.
+    """
+    crc = None
+    for n in itertools.count(1):
+        member = name if n == 1 else f"{n}/{name}"
+        info = zf.NameToInfo.get(member)
+        if info is None:
+            return member, True
+        if info.file_size == size:
+            if crc is None:
+                crc = _file_crc32(path)
+            if info.CRC == crc:
+                return member, False
+
+
+class CompactionJob:
+    """Moves old copies out of a Filled_Forms directory in bounded batches.
+
+    Memory stays proportional to `batch_size` whatever the directory size: the directory is streamed with
+    os.scandir and files are copied into archives in chunks by zipfile. When run on a background thread (`start()`)
+    it sleeps briefly every `yield_every` files so the Tk thread keeps the GIL and the share's bandwidth.
+    Only one kiosk compacts a directory at a time (lock file in the archive directory).
+    """
+
+    def __init__(self, filled_forms_dir, mode=MODE_ZIP, min_age_days=30, batch_size=500, yield_every=20,
+                 yield_seconds=0.005):
+        if mode not in (MODE_ZIP, MODE_SHARD):
+            raise ValueError(f"Unknown compaction mode: {mode}")
+        self.filled_forms_dir = Path(filled_forms_dir)
+        self.archive_dir = self.filled_forms_dir / ARCHIVE_DIRNAME
+        self.mode = mode
+        self.cutoff = datetime.now() - timedelta(days=min_age_days)
+        self.batch_size = batch_size
+        self.yield_every = yield_every
+        self.yield_seconds = yield_seconds
+        self._cancelled = threading.Event()
+        self._thread = None
+        self._processed = 0
+
+        self.scanned = 0
+        self.archived = 0
+        self.bytes_archived = 0
+        self.running = False
+        self.error = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="filled-forms-compaction", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def status(self):
+        state = "running" if self.running else ("failed: " + str(self.error) if self.error else "idle")
+        return (f"{state}, {self.archived} files archived, {self.scanned} entries scanned "
+                f"({self.bytes_archived / 1024 / 1024:.1f} MB, {self.mode})")
+
+    def run(self):
+        if not self.filled_forms_dir.is_dir():
+            return
+        self.archive_dir.mkdir(exist_ok=True)
+        if not self._acquire_lock():
+            print(f"Compaction of {self.filled_forms_dir} already running elsewhere, skipping.")
+            return
+        self.running = True
+        manifest = ArchiveManifest(self.archive_dir)
+        try:
+            # Removing files while os.scandir iterates may make it skip entries, so passes repeat until one
+            # finds nothing left to archive.
+            while not self._cancelled.is_set():
+                archived_before = self.archived
+                for batch in self._candidate_batches():
+                    if self._cancelled.is_set():
+                        break
+                    self._archive_batch(manifest, batch)
+                if self.archived == archived_before:
+                    break
+        except Exception as e:
+            self.error = e
+            print(f"Compaction of {self.filled_forms_dir} failed: {e}")
+        finally:
+            self.running = False
+            manifest.close()
+            self._release_lock()
+        if not self.error:
+            print(f"Compaction of {self.filled_forms_dir}: {self.status()}")
+
+    def _acquire_lock(self):
+        lock_path = self.archive_dir / LOCK_FILENAME
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    if time.time() - lock_path.stat().st_mtime < STALE_LOCK_SECONDS:
+                        return False
+                    lock_path.unlink()
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(f"{os.getpid()}\n")
+            return True
+        return False
+
+    def _release_lock(self):
+        try:
+            (self.archive_dir / LOCK_FILENAME).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _candidate_batches(self):
+        batch = []
+        with os.scandir(self.filled_forms_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+                self.scanned += 1
+                parsed = parse_copied_form_name(entry.name)
+                if parsed is None or parsed.timestamp >= self.cutoff:
+                    continue
+                batch.append((entry.name, entry.path, parsed))
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def _archive_batch(self, manifest, batch):
+        sessions = {}
+        for name, path, parsed in batch:
+            key = (parsed.user_type, parsed.safe_user_name, parsed.timestamp.strftime('%Y%m%d'))
+            sessions.setdefault(key, []).append((name, path))
+
+        archived_at = datetime.now().isoformat(timespec="seconds")
+        entries = []
+        moves = []
+        for (user_type, safe_user_name, session_date), files in sessions.items():
+            relpath = _archive_relpath(user_type, safe_user_name, session_date, self.mode)
+            target = self.archive_dir / relpath
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if self.mode == MODE_ZIP:
+                with zipfile.ZipFile(target, "a", zipfile.ZIP_STORED) as zf:
+                    for name, path in files:
+                        st = os.stat(path)
+                        member, write = _zip_member_for(zf, name, path, st.st_size)
+                        if write:
+                            zf.write(path, arcname=member)
+                        entries.append((name, user_type, safe_user_name, session_date, relpath, member,
+                                        st.st_size, st.st_mtime_ns, archived_at))
+                        moves.append((path, None))
+                        self._yield()
+            else:
+                target.mkdir(exist_ok=True)
+                for name, path in files:
+                    st = os.stat(path)
+                    entries.append((name, user_type, safe_user_name, session_date, relpath, name,
+                                    st.st_size, st.st_mtime_ns, archived_at))
+                    moves.append((path, target / name))
+
+        # Originals only leave the flat directory once the archives are closed and the manifest knows where they
+        # are; one manifest transaction per batch.
+        manifest.add_many(entries)
+        for (path, destination), entry in zip(moves, entries):
+            if destination is None:
+                os.unlink(path)
+            else:
+                os.replace(path, destination)
+                self._yield()
+            self.archived += 1
+            self.bytes_archived += entry[6]
+
+    def _yield(self):
+        self._processed += 1
+        if self.yield_seconds and self._processed % self.yield_every == 0:
+            time.sleep(self.yield_seconds)
+
+
+def restore(filled_forms_dir, name, destination_dir=None):
+    """Put an archived copy back (into Filled_Forms by default) and return its path.
+
+    Restoring into Filled_Forms takes the copy out of the manifest, so the next compaction archives it again, edits
+    included. Its ZIP member stays where it is, as members cannot be removed without rewriting the archive.
+    """
+    filled_forms_dir = Path(filled_forms_dir)
+    archive_dir = filled_forms_dir / ARCHIVE_DIRNAME
+    manifest = ArchiveManifest(archive_dir)
+    try:
+        entry = manifest.lookup(name)
+        if entry is None:
+            raise FileNotFoundError(f"'{name}' is not in the archive manifest")
+        destination = Path(destination_dir or filled_forms_dir) / name
+        source = archive_dir / entry.archive
+        tmp_path = destination.with_name(f".{name}.restoring")
+        if source.suffix == ".zip":
+            with zipfile.ZipFile(source) as zf, zf.open(entry.member) as fsrc, open(tmp_path, "wb") as fdst:
+                shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+        else:
+            shutil.copyfile(source / entry.member, tmp_path)
+        os.utime(tmp_path, ns=(entry.mtime_ns, entry.mtime_ns))
+        os.replace(tmp_path, destination)
+        if destination_dir is None:
+            if source.suffix != ".zip":
+                os.unlink(source / entry.member)
+            manifest.remove(name)
+        return destination
+    finally:
+        manifest.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="onboarding.compaction", description=__doc__.splitlines()[0])
+    parser.add_argument("filled_forms_dir", type=Path)
+    parser.add_argument("--mode", choices=(MODE_ZIP, MODE_SHARD), default=MODE_ZIP)
+    parser.add_argument("--min-age-days", type=int, default=30, help="only archive copies older than this")
+    parser.add_argument("--restore", nargs="+", metavar="NAME", help="restore archived copies instead")
+    args = parser.parse_args(argv)
+
+    if args.restore:
+        for name in args.restore:
+            try:
+                print(f"Restored {restore(args.filled_forms_dir, name)}")
+            except (OSError, KeyError) as e:
+                print(f"Could not restore '{name}': {e}", file=sys.stderr)
+                return 1
+        return 0
+
+    job = CompactionJob(args.filled_forms_dir, args.mode, args.min_age_days, yield_seconds=0)
+    job.run()
+    return 1 if job.error else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import functools
+import os
+import re
+import socket
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+FILLED_FORMS_SUBDIR = "Filled_Forms"
+SCRIPT_ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+class AppConfig(NamedTuple):
+    daycare_name: str
+    app_name: str
+    compact_after_days: Optional[int]
+    trace_export_path: Optional[str]
+    kiosk_id: str
+    prefill_name_fields: tuple
+    prefill_date_fields: tuple
+    scan_subfolders: bool
+    template_cache_dir: Path
+    template_cache_max_mb: int  # 0 disables the template cache
+    document_opener: Optional[str]
+
+
+class FormsDirs(NamedTuple):
+    parent_forms_dir: Path
+    staff_forms_dir: Path
+    parent_dir_source_msg: str
+    staff_dir_source_msg: str
+
+
+# Nothing here runs at import time: the .env lookup walks up from the CWD and the forms directories usually sit
+# on a network share, so both are resolved on first use and cached.
+
+@functools.lru_cache(maxsize=None)
+def load_env():
+    from dotenv import load_dotenv, find_dotenv
+
+    dotenv_path = find_dotenv(usecwd=True, raise_error_if_not_found=False)
+    if dotenv_path:
+        print(f"Loading .env file from: {dotenv_path}")
+        load_dotenv(dotenv_path)
+    else:
+        print("No .env file found. Using default directory settings.")
+    return dotenv_path
+
+
+def _default_template_cache_dir():
+    if os.name == "nt":
+        base = os.getenv("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "daycare-onboarding-forms" / "templates"
+
+
+def _env_list(env_var):
+    return tuple(item.strip() for item in os.getenv(env_var, "").split(",") if item.strip())
+
+
+@functools.lru_cache(maxsize=None)
+def get_config():
+    load_env()
+    daycare_name = os.getenv("DAYCARE_NAME", "Daycare")
+    compact_after_days = os.getenv("COMPACT_FILLED_FORMS_AFTER_DAYS")
+    if compact_after_days is not None:
+        try:
+            compact_after_days = int(compact_after_days)
+        except ValueError:
+            print(f"Warning: COMPACT_FILLED_FORMS_AFTER_DAYS '{compact_after_days}' is not a number. "
+                  f"Compaction disabled.")
+            compact_after_days = None
+    template_cache_max_mb = os.getenv("TEMPLATE_CACHE_MAX_MB", "256")
+    try:
+        template_cache_max_mb = max(int(template_cache_max_mb), 0)
+    except ValueError:
+        print(f"Warning: TEMPLATE_CACHE_MAX_MB '{template_cache_max_mb}' is not a number. Using 256.")
+        template_cache_max_mb = 256
+    # Part of every copy's file name, so kept to letters, digits and dashes.
+    kiosk_id = re.sub(r"[^A-Za-z0-9-]+", "-", os.getenv("KIOSK_ID") or socket.gethostname()).strip("-") or "kiosk"
+    return AppConfig(daycare_name, f"{daycare_name} Onboarding Forms", compact_after_days,
+                     os.getenv("TRACE_EXPORT_PATH") or None, kiosk_id,
+                     _env_list("PREFILL_NAME_FIELDS"), _env_list("PREFILL_DATE_FIELDS"),
+                     os.getenv("SCAN_FORM_SUBFOLDERS", "").strip().lower() in ("1", "true", "yes"),
+                     Path(os.getenv("TEMPLATE_CACHE_DIR") or _default_template_cache_dir()), template_cache_max_mb,
+                     os.getenv("DOCUMENT_OPENER") or None)
+
+
+def _resolve_forms_dir(env_var):
+    env_dir_str = os.getenv(env_var)
+    if env_dir_str and Path(env_dir_str).is_dir():
+        forms_dir = Path(env_dir_str)
+        source_msg = f"Using {env_var} from .env: {forms_dir}"
+    else:
+        forms_dir = SCRIPT_ROOT_DIR
+        if env_dir_str:
+            source_msg = f"Warning: {env_var} '{env_dir_str}' from .env is invalid. Defaulting to script root: {SCRIPT_ROOT_DIR}"
+        else:
+            source_msg = f"{env_var} not in .env. Defaulting to script root: {SCRIPT_ROOT_DIR}"
+    print(source_msg)
+    return forms_dir, source_msg
+
+
+@functools.lru_cache(maxsize=None)
+def get_forms_dirs():
+    load_env()
+    parent_forms_dir, parent_dir_source_msg = _resolve_forms_dir("PARENT_FORMS_DIR")
+    staff_forms_dir, staff_dir_source_msg = _resolve_forms_dir("STAFF_FORMS_DIR")
+    return FormsDirs(parent_forms_dir, staff_forms_dir, parent_dir_source_msg, staff_dir_source_msg)
+
+
+def forms_dir_for_user_type(user_type):
+    if user_type == "Parent":
+        return get_forms_dirs().parent_forms_dir
+    if user_type == "Staff":
+        return get_forms_dirs().staff_forms_dir
+    return None
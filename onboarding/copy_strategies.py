@@ -0,0 +1,387 @@
+import contextlib
+import errno
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import NamedTuple, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from onboarding.tracing import TRACER
+
+FICLONE = 0x40049409  # _IOW(0x94, 9, int) from linux/fs.h
+BLOB_STORE_DIRNAME = ".template_blobs"
+_REFLINK_UNSUPPORTED_ERRNOS = {errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV, errno.ENOSYS, errno.EPERM}
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class CopyResult(NamedTuple):
+    strategy: str
+    bytes_written: int
+    source_digest: Optional[str] = None  # sha256 of the content copied from the source
+
+
+def _file_digest(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _copy_hashing(src, dst):
+    """Copy the content of `src` to `dst`, returning its sha256, so the source is read only once."""
+    sha = hashlib.sha256()
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        for chunk in iter(lambda: fsrc.read(_HASH_CHUNK_SIZE), b""):
+            sha.update(chunk)
+            fdst.write(chunk)
+    return sha.hexdigest()
+
+
+def reflink(src, dst):
+    """Clone `src` to `dst` sharing extents (btrfs, XFS, bcachefs...). Raises OSError where unsupported."""
+    if fcntl is None:
+        raise OSError(errno.ENOSYS, "reflink is not supported on this platform")
+    with open(src, "rb") as fsrc:
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            fcntl.ioctl(fd, FICLONE, fsrc.fileno())
+        except OSError:
+            os.close(fd)
+            os.unlink(dst)
+            raise
+        os.close(fd)
+
+
+class TemplateBlobStore:
+    """Content-addressed copies of form templates, stored as `<sha256><ext>` under `root`.
+
+    A template is read (and hashed) once per version, where a version is its (path, size, mtime), so an unchanged
+    template costs one stat and every later copy is made from the blob instead. With `max_bytes`, the least
+    recently used blobs are evicted once the store holds more, and larger templates are not stored. Safe to use
+    from several threads; concurrent requests for one version read the template once.
+    """
+
+    def __init__(self, root, max_bytes=None):
+        self.root = os.fspath(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(self.root, "index.json")
+        self._index = None
+        self._fetching = {}  # version key -> lock held while that version is being fetched
+        self._pinned = {}  # blob name -> number of pinned_blob() blocks using it
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _load_index(self):
+        # {"versions": {version key: blob name}, "entries": {blob name: [size, last used]}}. An index in another
+        # layout is started over; blobs already on disk are then found again by name when fetched.
+        if self._index is None:
+            try:
+                with open(self._index_path, encoding="utf-8") as f:
+                    self._index = json.load(f)
+                if not all(isinstance(self._index.get(part), dict) for part in ("versions", "entries")):
+                    raise ValueError("unexpected template blob index layout")
+            except (OSError, ValueError, AttributeError):
+                self._index = {"versions": {}, "entries": {}}
+        return self._index
+
+    def _save_index(self):
+        tmp_path = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    @staticmethod
+    def version_key(template_path):
+        st = os.stat(template_path)
+        return f"{os.path.abspath(template_path)}|{st.st_size}|{st.st_mtime_ns}"
+
+    def blob_for(self, template_path):
+        """Return (blob_path, digest) for the current version of `template_path`, storing it on first use, or None
+        when it is larger than max_bytes. Raises OSError (e.g. FileNotFoundError) when the template cannot be read.
+        """
+        with self.pinned_blob(template_path) as blob:
+            return blob
+
+    @contextlib.contextmanager
+    def pinned_blob(self, template_path):
+        """Like blob_for, but the blob is not evicted before the block exits."""
+        key = self.version_key(template_path)
+        with self._lock:
+            entry = self._cached_entry(key)
+            if entry is None:
+                fetching = self._fetching.setdefault(key, threading.Lock())
+        if entry is None:
+            # Only one thread fetches a given version; the others wait for it and then find it stored.
+            try:
+                with fetching:
+                    with self._lock:
+                        entry = self._cached_entry(key)
+                    if entry is None:
+                        entry = self._fetch(template_path, key)
+            finally:
+                with self._lock:
+                    self._fetching.pop(key, None)
+        if entry is None:
+            yield None
+            return
+        try:
+            yield os.path.join(self.root, entry), entry.split(".", 1)[0]
+        finally:
+            with self._lock:
+                self._pinned[entry] -= 1
+                if not self._pinned[entry]:
+                    del self._pinned[entry]
+
+    def _pin(self, entry):
+        # Called with self._lock held.
+        self._pinned[entry] = self._pinned.get(entry, 0) + 1
+
+    def _cached_entry(self, key):
+        # Called with self._lock held; pins the entry it returns. Use times are saved with the index on the next
+        # fetch.
+        index = self._load_index()
+        entry = index["versions"].get(key)
+        if entry is None or entry not in index["entries"]:
+            return None
+        if not os.path.exists(os.path.join(self.root, entry)):
+            del index["entries"][entry]
+            return None
+        index["entries"][entry][1] = time.time()
+        self.hits += 1
+        self._pin(entry)
+        return entry
+
+    def _fetch(self, template_path, key):
+        # Returns the new entry, pinned, or None when the template is too large to store.
+        size = os.path.getsize(template_path)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return None
+        ext = os.path.splitext(template_path)[1].lower()
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f".incoming.{os.getpid()}.{threading.get_ident()}{ext}")
+        with TRACER.span("template_fetch", bytes=size):
+            try:
+                entry = _copy_hashing(template_path, tmp_path) + ext
+                shutil.copystat(template_path, tmp_path)
+                blob_path = os.path.join(self.root, entry)
+                if os.path.exists(blob_path):  # same content under another path or version
+                    os.unlink(tmp_path)
+                else:
+                    os.replace(tmp_path, blob_path)
+            except BaseException:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(tmp_path)
+                raise
+        # The template may have been replaced while it was read; then this content is not its current version.
+        unchanged = self.version_key(template_path) == key
+
+        with self._lock:
+            self.misses += 1
+            index = self._load_index()
+            # Older versions of the same template are no longer looked up.
+            template_prefix = key.rsplit("|", 2)[0] + "|"
+            for stale_key in [k for k in index["versions"] if k.startswith(template_prefix)]:
+                del index["versions"][stale_key]
+            if unchanged:
+                index["versions"][key] = entry
+            index["entries"][entry] = [os.path.getsize(blob_path), time.time()]
+            self._pin(entry)
+            if self.max_bytes is not None:
+                self._evict()
+            self._save_index()
+        return entry
+
+    def _evict(self):
+        # Called with self._lock held: drops the least recently used unpinned entries until the store fits in
+        # max_bytes.
+        entries = self._index["entries"]
+        total = sum(size for size, _ in entries.values())
+        for entry, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            if entry in self._pinned:
+                continue
+            try:
+                os.unlink(os.path.join(self.root, entry))
+            except FileNotFoundError:
+                pass
+            except OSError as e:  # e.g. still open in another process on Windows
+                print(f"Could not evict '{entry}' from the template blob store: {e}")
+                continue
+            del entries[entry]
+            total -= size
+            self.evictions += 1
+        live = set(entries)
+        self._index["versions"] = {k: v for k, v in self._index["versions"].items() if v in live}
+
+    def prefetch(self, template_paths, cancelled=lambda: False):
+        """Store `template_paths` in order until they fill max_bytes, or `cancelled()` returns True.
+
+        Meant for a background thread; templates that cannot be read are reported and skipped.
+        """
+        budget = self.max_bytes
+        for template_path in template_paths:
+            if cancelled():
+                return
+            try:
+                if budget is not None:
+                    budget -= os.path.getsize(template_path)
+                    if budget < 0:
+                        return
+                self.blob_for(template_path)
+            except OSError as e:
+                print(f"Could not prefetch '{template_path}': {e}")
+
+    def stats(self):
+        with self._lock:
+            entries = self._load_index()["entries"]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": sum(size for size, _ in entries.values()),
+            }
+
+
+class FormCopier:
+    """Creates form copies trying, in order: a reflink of the template, a reflink of its copy in the template blob
+    store, and finally shutil.copy2.
+
+    The blob store is only used where the target directory's filesystem is known to reflink (probed once per
+    device). Elsewhere, e.g. on SMB shares, writing each template version into the store and reading it back for
+    every copy costs more than copying the template.
+
+    Hardlinks are deliberately not used: viewers that save in place would write through to the template blob
+    and every other family's copy.
+
+    Every result carries the sha256 of the template's content. The template is hashed while it is read for the
+    copy, and only the first time a version is copied; later copies of that version reuse the digest.
+    """
+
+    STRATEGIES = ("reflink", "blob", "copy2")
+
+    def __init__(self, strategies=STRATEGIES):
+        self.strategies = tuple(strategies)
+        self._stores = {}
+        self._stores_lock = threading.Lock()
+        self._reflink_unsupported = set()  # (source device, target device) pairs
+        self._reflink_supported = set()
+        self._digests = {}  # template path -> (version key, sha256) of the version last copied
+        self._digests_lock = threading.Lock()
+
+    def blob_store(self, target_dir):
+        target_dir = os.fspath(target_dir)
+        with self._stores_lock:
+            store = self._stores.get(target_dir)
+            if store is None:
+                store = self._stores[target_dir] = TemplateBlobStore(os.path.join(target_dir, BLOB_STORE_DIRNAME))
+            return store
+
+    def _try_reflink(self, src, dst):
+        devices = (os.stat(src).st_dev, os.stat(os.path.dirname(os.path.abspath(dst))).st_dev)
+        if devices in self._reflink_unsupported:
+            return False
+        try:
+            reflink(src, dst)
+        except OSError as e:
+            if e.errno not in _REFLINK_UNSUPPORTED_ERRNOS:
+                raise
+            self._reflink_unsupported.add(devices)
+            return False
+        return True
+
+    def _reflinks_within(self, directory):
+        devices = (os.stat(directory).st_dev,) * 2
+        if devices in self._reflink_unsupported:
+            return False
+        if devices not in self._reflink_supported:
+            probe = os.path.join(directory, f".reflink-probe.{os.getpid()}-{threading.get_ident()}")
+            with open(probe, "wb") as f:
+                f.write(b"\0")
+            try:
+                if not self._try_reflink(probe, probe + ".clone"):
+                    return False
+                os.unlink(probe + ".clone")
+            finally:
+                os.unlink(probe)
+            self._reflink_supported.add(devices)
+        return True
+
+    def copy(self, src, dst, finish=None, exclude=(), source_digest=None):
+        """Copy `src` to `dst` atomically: the data goes to a hidden temp file in the same directory which is then
+        renamed, so other kiosks never see a partially written copy.
+
+        `finish(temp_path)`, if given, runs on the complete copy before the rename and returns the number of bytes
+        it wrote, which is added to the result's bytes_written. Strategies named in `exclude` are not tried.
+        `source_digest` is the sha256 of `src` when the caller already knows it."""
+        src, dst = os.fspath(src), os.fspath(dst)
+        tmp_path = os.path.join(os.path.dirname(dst),
+                                f".{os.path.basename(dst)}.{os.getpid()}-{threading.get_ident()}.partial")
+        try:
+            result = self._copy_to(src, tmp_path, exclude, source_digest)
+            if finish is not None:
+                result = result._replace(bytes_written=result.bytes_written + finish(tmp_path))
+            os.replace(tmp_path, dst)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return result
+
+    def _copy_to(self, src, dst, exclude=(), digest=None):
+        template_path = os.path.abspath(src)
+        key = TemplateBlobStore.version_key(src)
+        if digest is None:
+            with self._digests_lock:
+                known_key, known_digest = self._digests.get(template_path, (None, None))
+            digest = known_digest if known_key == key else None
+        result = self._copy_with_strategies(src, dst, exclude, digest)
+        with self._digests_lock:
+            self._digests[template_path] = (key, result.source_digest)
+        return result
+
+    def _copy_with_strategies(self, src, dst, exclude, digest):
+        for strategy in self.strategies:
+            if strategy in exclude:
+                continue
+            if strategy == "reflink":
+                if self._try_reflink(src, dst):
+                    shutil.copystat(src, dst)
+                    return CopyResult("reflink", 0, digest or _file_digest(src))
+            elif strategy == "blob":
+                if not self._reflinks_within(os.path.dirname(dst)):
+                    continue
+                try:
+                    blob_path, digest = self.blob_store(os.path.dirname(dst)).blob_for(src)
+                except OSError as e:
+                    if isinstance(e, FileNotFoundError) and not os.path.exists(src):
+                        raise
+                    print(f"Template blob store unavailable, falling back: {e}")
+                    continue
+                if self._try_reflink(blob_path, dst):
+                    shutil.copystat(src, dst)
+                    return CopyResult("blob+reflink", 0, digest)
+            elif strategy == "copy2":
+                if digest is None:
+                    digest = _copy_hashing(src, dst)
+                    shutil.copystat(src, dst)
+                else:
+                    shutil.copy2(src, dst)
+                return CopyResult("copy2", os.path.getsize(dst), digest)
+            else:
+                raise ValueError(f"Unknown copy strategy: {strategy}")
+        raise OSError(f"No copy strategy succeeded for {src}")
@@ -0,0 +1,154 @@
+import functools
+import os
+import re
+from collections import Counter, defaultdict
+from typing import List, NamedTuple, Optional, Tuple
+
+from onboarding.catalog import CATEGORY_SEPARATOR, form_category
+
+# Share of the query's trigrams a form must contain to be offered as a fuzzy match.
+FUZZY_MIN_SCORE = 0.4
+
+_WORD_RE = re.compile(r"[^\W_]+")
+_EMPTY = frozenset()
+
+
+def _words(text):
+    return _WORD_RE.findall(text.lower())
+
+
+def _trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def _query_keys(word):
+    return _trigrams(word) if len(word) > 2 else {word}
+
+
+@functools.lru_cache(maxsize=8192)
+def _index_keys(word):
+    # Form names reuse a small vocabulary, so each word's keys are worked out once.
+    return frozenset(_trigrams(word) | {word[:1], word[:2]})
+
+
+class _Entry(NamedTuple):
+    name: str
+    text: str  # lower-cased words of the category and file name (without extension), space separated
+    category: str
+    keys: frozenset  # trigrams, plus one- and two-letter word prefixes, the form is indexed under
+
+
+class FormSearchIndex:
+    """Token/trigram index over the forms of one catalog listing, for filtering the forms list as the user types.
+
+    Query words of one or two characters match word prefixes; longer ones must occur in the form's name or
+    category, found by intersecting trigram postings. When no form matches every word, forms sharing enough of
+    the query's trigrams are returned best first, so typos still find something. `sync()` applies only the
+    difference from the previous listing.
+    """
+
+    def __init__(self):
+        self._entries = {}  # path -> _Entry
+        self._postings = defaultdict(set)  # trigram or short prefix -> set of paths
+        self._by_category = {}  # category -> set of paths
+        self._forms = []  # (name, path) in listing order
+        self._order = {}
+
+    def __len__(self):
+        return len(self._forms)
+
+    def sync(self, forms) -> Tuple[int, int]:
+        """Make the index match `forms`, a sorted (name, path) listing. Returns (added, removed) counts."""
+        forms = list(forms)
+        if forms == self._forms:
+            return 0, 0
+        names = {path: name for name, path in forms}
+        removed = [path for path, entry in self._entries.items() if names.get(path) != entry.name]
+        for path in removed:
+            self._remove(path)
+        added = [(name, path) for name, path in forms if path not in self._entries]
+        for name, path in added:
+            self._add(name, path)
+        self._forms = forms
+        self._order = {path: i for i, (_, path) in enumerate(forms)}
+        return len(added), len(removed)
+
+    def categories(self) -> List[str]:
+        """Categories (subfolders) holding at least one form, sorted; "" stands for the top level."""
+        return sorted(self._by_category, key=str.lower)
+
+    def search(self, query, category: Optional[str] = None) -> List[Tuple[str, str]]:
+        """(name, path) pairs matching `query`, limited to `category` and its subfolders when given.
+
+        Exact matches keep the listing order; fuzzy ones come best first.
+        """
+        words = _words(query)
+        scope = self._category_paths(category) if category is not None else None
+        matches = scope
+        if words:
+            matches = self._exact(words, scope)
+            if not matches:
+                return self._fuzzy(words, scope)
+        if matches is None:
+            return list(self._forms)
+        return [form for form in self._forms if form[1] in matches]
+
+    def _add(self, name, path):
+        category = form_category(name)
+        words = _words(os.path.splitext(name)[0])
+        keys = frozenset().union(*map(_index_keys, words))
+        self._entries[path] = _Entry(name, " ".join(words), category, keys)
+        postings = self._postings
+        for key in keys:
+            postings[key].add(path)
+        self._by_category.setdefault(category, set()).add(path)
+
+    def _remove(self, path):
+        entry = self._entries.pop(path)
+        for key in entry.keys:
+            postings = self._postings[key]
+            postings.discard(path)
+            if not postings:
+                del self._postings[key]
+        paths = self._by_category[entry.category]
+        paths.discard(path)
+        if not paths:
+            del self._by_category[entry.category]
+
+    def _category_paths(self, category):
+        prefix = category + CATEGORY_SEPARATOR
+        paths = set()
+        for name, members in self._by_category.items():
+            if name == category or (category and name.startswith(prefix)):
+                paths |= members
+        return paths
+
+    def _exact(self, words, scope):
+        matches = scope
+        for word in words:
+            postings = sorted((self._postings.get(key, _EMPTY) for key in _query_keys(word)), key=len)
+            candidates = postings[0].intersection(*postings[1:])
+            if matches is not None:
+                candidates &= matches
+            if len(word) > 2:
+                # Trigrams can all be present without being adjacent.
+                candidates = {path for path in candidates if word in self._entries[path].text}
+            matches = candidates
+            if not matches:
+                break
+        return matches
+
+    def _fuzzy(self, words, scope):
+        keys = set()
+        for word in words:
+            keys |= _query_keys(word)
+        counts = Counter()
+        for key in keys:
+            postings = self._postings.get(key)
+            if postings:
+                counts.update(postings)
+        needed = FUZZY_MIN_SCORE * len(keys)
+        ranked = sorted((path for path, count in counts.items()
+                         if count >= needed and (scope is None or path in scope)), key=self._order.__getitem__)
+        ranked.sort(key=counts.__getitem__, reverse=True)  # stable: ties stay in listing order
+        return [(self._entries[path].name, path) for path in ranked]
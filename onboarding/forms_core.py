@@ -0,0 +1,160 @@
+import contextlib
+import functools
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from onboarding.catalog import CATEGORY_SEPARATOR
+from onboarding.config import FILLED_FORMS_SUBDIR, get_config
+from onboarding.copy_strategies import CopyResult
+from onboarding.pdf_prefill import prefill_pdf
+from onboarding.save_watcher import quick_hash
+from onboarding.session_index import STATE_CREATED, SessionIndex, template_version
+from onboarding.tracing import TRACER
+
+
+# {base}_{user_type}_{safe_user_name}_{%Y%m%d_%H%M%S}[_{kiosk_id}-{sequence}]{ext}. Copies made before kiosk ids
+# were added have no suffix. The base is matched greedily so form names that themselves contain "_Parent_"/"_Staff_"
+# still split on the user type added by copied_form_name().
+_COPIED_FORM_NAME_RE = re.compile(
+    r"^(?P<base>.+)_(?P<user_type>Parent|Staff)_(?P<safe_user_name>.+)_(?P<timestamp>\d{8}_\d{6})"
+    r"(?:_(?P<kiosk_id>[A-Za-z0-9-]+)-(?P<sequence>\d+))?(?P<ext>\.[A-Za-z0-9]+)?$")
+
+
+class CopiedFormName(NamedTuple):
+    base: str
+    user_type: str
+    safe_user_name: str
+    timestamp: datetime
+    ext: str
+    kiosk_id: Optional[str] = None
+    sequence: Optional[int] = None
+
+
+class FormCopy(NamedTuple):
+    path: Path
+    opened_existing: bool
+    template_version: str
+    copy_result: Optional[CopyResult]
+    state: str
+    baseline_hash: Optional[str] = None
+    template_fingerprint: Optional[str] = None
+
+
+PREFILL_DATE_FORMAT = "%m/%d/%Y"
+
+
+def make_safe_user_name(user_name):
+    return "".join(c if c.isalnum() or c in " _-" else "_" for c in user_name)
+
+
+def copied_form_base(form_name):
+    """The `base` that copies of `form_name` carry in their names (see parse_copied_form_name)."""
+    # Forms from subfolders ("Medical/Allergy Plan.pdf") keep their category in the name of the flat copy.
+    return os.path.splitext(form_name.replace(CATEGORY_SEPARATOR, " - "))[0]
+
+
+def copied_form_name(form_name, user_type, user_name, when=None, kiosk_id=None, sequence=None):
+    base, ext = copied_form_base(form_name), os.path.splitext(form_name)[1]
+    timestamp_str = (when or datetime.now()).strftime('%Y%m%d_%H%M%S')
+    # The timestamp only has second resolution; the kiosk id and its sequence number keep names from kiosks
+    # sharing a Filled_Forms directory apart.
+    suffix = f"_{kiosk_id}-{sequence}" if kiosk_id else ""
+    return f"{base}_{user_type}_{make_safe_user_name(user_name)}_{timestamp_str}{suffix}{ext}"
+
+
+def parse_copied_form_name(name) -> Optional[CopiedFormName]:
+    match = _COPIED_FORM_NAME_RE.match(name)
+    if not match:
+        return None
+    ts = match["timestamp"]
+    try:
+        # Same as strptime(ts, '%Y%m%d_%H%M%S') for the digits the pattern allows, several times faster, which
+        # matters when indexing years of copies.
+        timestamp = datetime(int(ts[:4]), int(ts[4:6]), int(ts[6:8]), int(ts[9:11]), int(ts[11:13]), int(ts[13:]))
+    except ValueError:
+        return None
+    return CopiedFormName(match["base"], match["user_type"], match["safe_user_name"], timestamp, match["ext"] or "",
+                          match["kiosk_id"], int(match["sequence"]) if match["sequence"] else None)
+
+
+def prefill_values(form_name, user_name, when=None):
+    """Values for the PDF fields listed in PREFILL_NAME_FIELDS / PREFILL_DATE_FIELDS; empty for other forms."""
+    config = get_config()
+    if not form_name.lower().endswith(".pdf"):
+        return {}
+    values = dict.fromkeys(config.prefill_name_fields, user_name)
+    values.update(dict.fromkeys(config.prefill_date_fields, (when or datetime.now()).strftime(PREFILL_DATE_FORMAT)))
+    return values
+
+
+def _prefill(template_path, values, copy_path):
+    # A form that cannot be prefilled is still handed out, just blank.
+    try:
+        return prefill_pdf(template_path, copy_path, values)
+    except (OSError, ValueError) as e:
+        print(f"Could not prefill '{template_path}': {e}")
+        return 0
+
+
+def prepare_form_copy(form_copier, original_form_path, form_name, forms_directory, user_type, user_name,
+                      template_cache=None):
+    """Return the copy of a form to hand to `user_name`, reusing the one recorded in the session index when it
+    still exists, otherwise copying the template into Filled_Forms and recording it along with the template's
+    fingerprint. New copies are made from `template_cache`'s (a TemplateBlobStore) local copy of the template when
+    one is given.
+
+    Raises NotADirectoryError when `forms_directory` is missing and FileNotFoundError when the template is.
+    """
+    forms_directory = Path(forms_directory)
+    if not forms_directory.is_dir():
+        raise NotADirectoryError(str(forms_directory))
+
+    filled_forms_path_dir = forms_directory / FILLED_FORMS_SUBDIR
+    session_index = SessionIndex.for_directory(filled_forms_path_dir)
+    version = template_version(original_form_path)
+
+    with TRACER.span("session_index_lookup"):
+        existing = session_index.lookup(user_type, user_name, form_name, version)
+    if existing is not None:
+        if existing.copied_path.exists():
+            print(f"Reopening existing file for '{user_name}': {existing.copied_path}")
+            return FormCopy(existing.copied_path, True, version, None, existing.state, existing.baseline_hash,
+                            existing.template_fingerprint)
+        print(
+            f"Recorded path {existing.copied_path} for '{original_form_path}' "
+            f"is invalid or non-existent for user '{user_name}'. "
+            f"Will attempt to create a new copy."
+        )
+
+    kiosk_id = get_config().kiosk_id
+    target_copied_form_path = filled_forms_path_dir / copied_form_name(
+        form_name, user_type, user_name, kiosk_id=kiosk_id, sequence=session_index.next_sequence(kiosk_id))
+    values = prefill_values(form_name, user_name)
+    # None when there is no cache or the template is too large for it.
+    local_copy = template_cache.pinned_blob(original_form_path) if template_cache else contextlib.nullcontext()
+    with local_copy as blob:
+        # A local copy is copied straight into Filled_Forms: staging it in the share's blob store would only
+        # read it back over the network.
+        template_path, digest, exclude = (*blob, ("blob",)) if blob else (original_form_path, None, ())
+        finish = functools.partial(_prefill, template_path, values) if values else None
+        with TRACER.span("copy_form", form=form_name) as span:
+            copy_result = form_copier.copy(template_path, target_copied_form_path, finish=finish, exclude=exclude,
+                                           source_digest=digest)
+            span.end(strategy=copy_result.strategy, bytes_written=copy_result.bytes_written)
+    fingerprint = copy_result.source_digest
+    # Hashed now rather than from the template later: the template may be replaced while the copy is still open.
+    baseline_hash = quick_hash(target_copied_form_path)
+    winner = session_index.claim(user_type, user_name, form_name, version, target_copied_form_path, baseline_hash,
+                                 fingerprint)
+    if winner is not None:
+        target_copied_form_path.unlink()
+        print(f"Another kiosk already copied '{form_name}' for '{user_name}', reopening: {winner.copied_path}")
+        return FormCopy(winner.copied_path, True, version, None, winner.state, winner.baseline_hash,
+                        winner.template_fingerprint)
+    print(f"Copied new file to: {target_copied_form_path} for user '{user_name}' "
+          f"({copy_result.strategy}, {copy_result.bytes_written} bytes written, template {fingerprint[:12]})")
+    return FormCopy(target_copied_form_path, False, version, copy_result, STATE_CREATED, baseline_hash,
+                    fingerprint)
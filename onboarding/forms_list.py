@@ -0,0 +1,76 @@
+from typing import Callable, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class FormRow(NamedTuple):
+    name: str
+    path: str
+    text: str
+    enabled: bool = True
+
+
+class FormsListModel:
+    """Rows shown in the forms list, diffed against the last update so the view only touches what changed.
+
+    Built rows are kept per form, so re-filtering a large catalog does not recompute every label: callers must
+    call `refresh_row()` when a form's state changes and `invalidate()` when all of it is reset.
+    """
+
+    def __init__(self, row_text: Optional[Callable[[str, str], Tuple[str, bool]]] = None):
+        self.row_text = row_text or (lambda name, path: (name, True))
+        self.rows: List[FormRow] = []
+        self._index_by_path = {}
+        self._rows_by_path = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _build_row(self, name, path):
+        text, enabled = self.row_text(name, path)
+        row = self._rows_by_path[path] = FormRow(name, path, text, enabled)
+        return row
+
+    def clear(self):
+        structure_changed = bool(self.rows)
+        self.rows = []
+        self._index_by_path = {}
+        return structure_changed, set()
+
+    def invalidate(self):
+        """Forget every built row; the next update() recomputes all labels."""
+        self._rows_by_path = {}
+
+    def update(self, forms: Iterable[Tuple[str, str]]):
+        """Replace the rows with `forms` ((name, path) pairs, already sorted).
+
+        Returns (structure_changed, changed_indices). When the set or order of forms is unchanged only the
+        indices whose label/state differ are reported; otherwise every row must be rebound.
+        """
+        built = self._rows_by_path
+        new_rows = [built.get(path) or self._build_row(name, path) for name, path in forms]
+        old_rows = self.rows
+        self.rows = new_rows
+
+        same_structure = len(old_rows) == len(new_rows) and all(
+            old.path == new.path for old, new in zip(old_rows, new_rows))
+        if not same_structure:
+            self._index_by_path = None  # rebuilt by refresh_row() when needed
+            return True, set(range(len(new_rows)))
+
+        changed = {i for i, (old, new) in enumerate(zip(old_rows, new_rows)) if old != new}
+        return False, changed
+
+    def refresh_row(self, path) -> Set[int]:
+        """Recompute a single row's label/state, e.g. after that form was opened."""
+        if self._index_by_path is None:
+            self._index_by_path = {row.path: i for i, row in enumerate(self.rows)}
+        index = self._index_by_path.get(path)
+        if index is None:
+            self._rows_by_path.pop(path, None)  # filtered out: rebuilt when it is shown again
+            return set()
+        row = self.rows[index]
+        self._rows_by_path.pop(path, None)
+        new_row = self._build_row(row.name, row.path)
+        if new_row == row:
+            return set()
+        self.rows[index] = new_row
+        return {index}
@@ -0,0 +1,138 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+DIRECTORY_LISTING_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class InotifyWatcher:
+    """Watches directories with Linux inotify and reports events from a daemon thread.
+
+    `callback(directory, name, mask)` is called for every event; on queue overflow it is called once per
+    watched directory with an empty name, meaning "anything may have changed". Use `InotifyWatcher.create()`
+    which returns None on platforms (or filesystems) where inotify is unavailable.
+    """
+
+    def __init__(self, libc, callback, mask=DIRECTORY_LISTING_MASK):
+        self._libc = libc
+        self._callback = callback
+        self._mask = mask
+        self._lock = threading.Lock()
+        self._dirs_by_wd = {}
+        self._wd_by_dir = {}
+        self._fd = libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wake_r, self._wake_w = os.pipe()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="inotify-watcher", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def create(cls, callback, mask=DIRECTORY_LISTING_MASK):
+        libc = _load_libc()
+        if libc is None:
+            return None
+        try:
+            return cls(libc, callback, mask)
+        except OSError as e:
+            print(f"inotify unavailable, falling back to polling: {e}")
+            return None
+
+    def watch(self, directory):
+        directory = str(directory)
+        with self._lock:
+            if directory in self._wd_by_dir:
+                return True
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self._mask | IN_ONLYDIR)
+            if wd < 0:
+                return False
+            self._dirs_by_wd[wd] = directory
+            self._wd_by_dir[directory] = wd
+            return True
+
+    def unwatch(self, directory):
+        with self._lock:
+            wd = self._wd_by_dir.pop(str(directory), None)
+            if wd is not None:
+                self._dirs_by_wd.pop(wd, None)
+                self._libc.inotify_rm_watch(self._fd, wd)
+
+    def is_watching(self, directory):
+        with self._lock:
+            return str(directory) in self._wd_by_dir
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        os.write(self._wake_w, b"x")
+        self._thread.join(timeout=1)
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            os.close(fd)
+
+    def _run(self):
+        while not self._closed:
+            readable, _, _ = select.select([self._fd, self._wake_r], [], [])
+            if self._wake_r in readable:
+                return
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except OSError:
+                return
+            for directory, name, mask in self._parse(data):
+                try:
+                    self._callback(directory, name, mask)
+                except Exception as e:
+                    print(f"Error in file watcher callback: {e}")
+
+    def _parse(self, data):
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            with self._lock:
+                if mask & IN_Q_OVERFLOW:
+                    events = [(directory, "", mask) for directory in self._wd_by_dir]
+                else:
+                    directory = self._dirs_by_wd.get(wd)
+                    events = [(directory, name, mask)] if directory is not None else []
+                if mask & IN_IGNORED:
+                    directory = self._dirs_by_wd.pop(wd, None)
+                    if directory is not None:
+                        self._wd_by_dir.pop(directory, None)
+            yield from events
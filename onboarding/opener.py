@@ -0,0 +1,104 @@
+import functools
+import os
+import platform
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+from typing import NamedTuple
+
+from onboarding.config import get_config
+from onboarding.tracing import TRACER
+
+
+class ViewerLaunchError(Exception):
+    def __init__(self, path, cause):
+        super().__init__(f"Could not open '{path}': {cause}")
+        self.path = path
+        self.cause = cause
+
+
+class Opener(NamedTuple):
+    name: str
+    command: tuple  # arguments the document path is appended to; empty for os.startfile
+    waits_for_viewer: bool  # the process lives as long as the viewer window, so its exit means the window closed
+
+
+def _split_command(command):
+    if os.name != "nt":
+        return tuple(shlex.split(command))
+    # Non-POSIX splitting keeps Windows backslashes but also the quotes around "C:\Program Files\..." paths.
+    return tuple(arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] == '"' else arg
+                 for arg in shlex.split(command, posix=False))
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_opener():
+    """The program documents are opened with: DOCUMENT_OPENER when set, else the platform's default handler.
+
+    Resolved once; DOCUMENT_OPENER is expected to run the viewer itself (or a stand-in such as
+    benchmarks/stub_viewer.py), so its exit is taken as the viewer window closing. The platform handlers hand the
+    document over to a viewer and return, so they cannot tell.
+    """
+    configured = get_config().document_opener
+    if configured:
+        command = _split_command(configured)
+        return Opener(configured, command, True)
+    system = platform.system()
+    if system == 'Windows':
+        return Opener("startfile", (), False)
+    name = 'open' if system == 'Darwin' else 'xdg-open'
+    return Opener(name, (shutil.which(name) or name,), False)
+
+
+class DocumentLauncher:
+    """Opens documents with the resolved opener without waiting for it, and tracks the processes it starts.
+
+    Each process is waited for by a daemon thread, so no zombies are left behind; `on_exit(key, path, returncode)`
+    is then called from that thread. os.startfile exposes no process, so nothing is reported for it.
+    """
+
+    def __init__(self, opener=None, on_exit=None):
+        self.opener = opener or resolve_opener()
+        self.on_exit = on_exit
+        self._lock = threading.Lock()
+        self._running = {}  # process -> path
+        self.launches = 0
+
+    def launch(self, path, key=None):
+        """Start the viewer for `path` and return its process (None with os.startfile).
+
+        Raises ViewerLaunchError when the opener cannot be started.
+        """
+        try:
+            with TRACER.span("viewer_launch", opener=self.opener.name):
+                if not self.opener.command:
+                    os.startfile(str(path))
+                    process = None
+                else:
+                    process = subprocess.Popen((*self.opener.command, str(path)), stdin=subprocess.DEVNULL)
+        except Exception as e:
+            raise ViewerLaunchError(path, e) from e
+        with self._lock:
+            self.launches += 1
+            if process is not None:
+                self._running[process] = path
+        if process is not None:
+            threading.Thread(target=self._reap, args=(process, key, path, time.perf_counter()), name="viewer-reaper",
+                             daemon=True).start()
+        return process
+
+    def running_count(self):
+        with self._lock:
+            return len(self._running)
+
+    def _reap(self, process, key, path, started):
+        returncode = process.wait()
+        with self._lock:
+            self._running.pop(process, None)
+        if TRACER.enabled:
+            TRACER.record("viewer_exit" if self.opener.waits_for_viewer else "viewer_opener_exit",
+                          time.perf_counter() - started, {"returncode": returncode})
+        if self.on_exit is not None:
+            self.on_exit(key, path, returncode)
@@ -0,0 +1,510 @@
+"""Prefill AcroForm text fields of a PDF copy by appending an incremental update.
+
+The original bytes are never rewritten: new versions of the changed field objects and of the AcroForm dictionary
+(with /NeedAppearances, so viewers draw the new values) are appended after the last %%EOF together with a
+cross-reference section chaining back to the old one. Writing costs the same for a one-page form and a 30 MB
+scanned packet. Finding the fields means reading the template's cross-reference data and walking its field tree;
+that is done once per template version and cached.
+"""
+import codecs
+import functools
+import os
+import re
+import zlib
+from typing import NamedTuple, Optional
+
+from onboarding.session_index import template_version
+from onboarding.tracing import TRACER
+
+_CHUNK = 4096
+_WHITESPACE = b"\x00\t\n\x0c\r "
+_REGULAR_END_RE = re.compile(rb"[\x00\t\n\x0c\r ()<>\[\]{}/%]")
+_REF_TAIL_RE = re.compile(rb"\s+(\d+)\s+R(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])")
+_OBJ_HEADER_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj")
+_OCTAL_RE = re.compile(rb"[0-7]{1,3}")
+_NAME_ESCAPE_RE = re.compile(rb"[^!-~]|[#()<>\[\]{}/%]")
+_STRING_ESCAPES = {ord("n"): b"\n", ord("r"): b"\r", ord("t"): b"\t", ord("b"): b"\b", ord("f"): b"\f"}
+
+
+class PdfSyntaxError(ValueError):
+    pass
+
+
+class Name(str):
+    """A PDF name, without its leading slash."""
+
+
+class Token(bytes):
+    """A number or keyword (true, false, null) kept exactly as written."""
+
+
+class Ref(NamedTuple):
+    num: int
+    gen: int
+
+
+def _skip_whitespace(data, pos):
+    n = len(data)
+    while pos < n:
+        if data[pos] in _WHITESPACE:
+            pos += 1
+        elif data[pos] == 0x25:  # % comment
+            while pos < n and data[pos] not in b"\r\n":
+                pos += 1
+        else:
+            break
+    return pos
+
+
+def _parse_literal_string(data, pos):
+    out = bytearray()
+    depth = 1
+    n = len(data)
+    while pos < n:
+        c = data[pos]
+        if c == 0x5C:  # backslash
+            pos += 1
+            if pos >= n:
+                break
+            c = data[pos]
+            if c in _STRING_ESCAPES:
+                out += _STRING_ESCAPES[c]
+                pos += 1
+            elif 0x30 <= c <= 0x37:
+                match = _OCTAL_RE.match(data, pos)
+                out.append(int(match[0], 8) & 0xFF)
+                pos = match.end()
+            elif c == 0x0D:  # escaped line break: line continuation
+                pos += 2 if data.startswith(b"\r\n", pos) else 1
+            elif c == 0x0A:
+                pos += 1
+            else:
+                out.append(c)
+                pos += 1
+            continue
+        if c == 0x28:
+            depth += 1
+        elif c == 0x29:
+            depth -= 1
+            if depth == 0:
+                return bytes(out), pos + 1
+        out.append(c)
+        pos += 1
+    raise PdfSyntaxError("unterminated string")
+
+
+def parse_value(data, pos=0):
+    """Parse one PDF object from `data` at `pos`. Returns (value, end position).
+
+    Dictionaries become dicts keyed by Name, arrays lists, strings bytes, indirect references Ref and everything
+    else a Token. Raises PdfSyntaxError, also when `data` ends before the object does.
+    """
+    pos = _skip_whitespace(data, pos)
+    if pos >= len(data):
+        raise PdfSyntaxError("unexpected end of data")
+    if data.startswith(b"<<", pos):
+        result = {}
+        pos += 2
+        while True:
+            pos = _skip_whitespace(data, pos)
+            if data.startswith(b">>", pos):
+                return result, pos + 2
+            key, pos = parse_value(data, pos)
+            if not isinstance(key, Name):
+                raise PdfSyntaxError(f"dictionary key is not a name at offset {pos}")
+            result[key], pos = parse_value(data, pos)
+    c = data[pos:pos + 1]
+    if c == b"[":
+        items = []
+        pos += 1
+        while True:
+            pos = _skip_whitespace(data, pos)
+            if data.startswith(b"]", pos):
+                return items, pos + 1
+            item, pos = parse_value(data, pos)
+            items.append(item)
+    if c == b"(":
+        return _parse_literal_string(data, pos + 1)
+    if c == b"<":
+        end = data.find(b">", pos)
+        if end < 0:
+            raise PdfSyntaxError("unterminated hex string")
+        digits = re.sub(rb"\s", b"", data[pos + 1:end])
+        try:
+            return bytes.fromhex((digits + b"0" * (len(digits) % 2)).decode("ascii")), end + 1
+        except ValueError:
+            raise PdfSyntaxError(f"bad hex string at offset {pos}") from None
+    if c == b"/":
+        match = _REGULAR_END_RE.search(data, pos + 1)
+        end = match.start() if match else len(data)
+        raw = re.sub(rb"#([0-9A-Fa-f]{2})", lambda m: bytes([int(m[1], 16)]), data[pos + 1:end])
+        return Name(raw.decode("latin-1")), end
+    match = _REGULAR_END_RE.search(data, pos)
+    if match is None:  # a number or keyword needs a delimiter after it, or it may have been cut short
+        raise PdfSyntaxError("unexpected end of data")
+    end = match.start()
+    if end == pos:
+        raise PdfSyntaxError(f"unexpected {c!r} at offset {pos}")
+    token = data[pos:end]
+    if token.isdigit():
+        ref = _REF_TAIL_RE.match(data, end)
+        if ref:
+            return Ref(int(token), int(ref[1])), ref.end()
+    return Token(token), end
+
+
+def serialize(value):
+    if isinstance(value, Token):
+        return bytes(value)
+    if isinstance(value, bytes):
+        return b"<" + value.hex().encode("ascii") + b">"
+    if isinstance(value, Name):
+        return b"/" + _NAME_ESCAPE_RE.sub(lambda m: b"#%02X" % m[0][0], value.encode("latin-1"))
+    if isinstance(value, Ref):
+        return b"%d %d R" % value
+    if isinstance(value, bool):
+        return b"true" if value else b"false"
+    if isinstance(value, int):
+        return b"%d" % value
+    if isinstance(value, dict):
+        return b"<<" + b"".join(serialize(Name(key)) + b" " + serialize(item) for key, item in value.items()) + b">>"
+    if isinstance(value, list):
+        return b"[" + b" ".join(serialize(item) for item in value) + b"]"
+    raise TypeError(f"Cannot serialize {value!r} as a PDF object")
+
+
+def _parse_indirect(data):
+    header = _OBJ_HEADER_RE.match(data)
+    if not header:
+        raise PdfSyntaxError("expected an indirect object")
+    value, pos = parse_value(data, header.end())
+    pos = _skip_whitespace(data, pos)
+    if not (data.startswith(b"endobj", pos) or data.startswith(b"stream", pos)):
+        raise PdfSyntaxError("indirect object not terminated")
+    return int(header[1]), int(header[2]), value, pos
+
+
+def _png_unpredict(data, columns, colors, bits):
+    bpp = max(1, colors * bits // 8)
+    row_length = (columns * colors * bits + 7) // 8
+    out = bytearray()
+    previous = bytearray(row_length)
+    for start in range(0, len(data), row_length + 1):
+        kind = data[start]
+        row = bytearray(data[start + 1:start + 1 + row_length])
+        for i in range(len(row)):
+            left = row[i - bpp] if i >= bpp else 0
+            up = previous[i]
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + ((left + up) >> 1)) & 0xFF
+            elif kind == 4:
+                up_left = previous[i - bpp] if i >= bpp else 0
+                p = left + up - up_left
+                pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+                row[i] = (row[i] + (left if pa <= pb and pa <= pc else up if pb <= pc else up_left)) & 0xFF
+        out += row
+        previous = row
+    return bytes(out)
+
+
+def _decode_stream(stream_dict, data):
+    filters, parms = stream_dict.get("Filter"), stream_dict.get("DecodeParms")
+    if filters is None:
+        return data
+    if not isinstance(filters, list):
+        filters, parms = [filters], [parms]
+    elif not isinstance(parms, list):
+        parms = [parms] * len(filters)
+    for stream_filter, parm in zip(filters, parms):
+        if stream_filter != "FlateDecode":
+            raise PdfSyntaxError(f"unsupported stream filter /{stream_filter}")
+        data = zlib.decompressobj().decompress(data)
+        if isinstance(parm, dict) and int(parm.get("Predictor", 1)) >= 10:
+            data = _png_unpredict(data, int(parm.get("Columns", 1)), int(parm.get("Colors", 1)),
+                                  int(parm.get("BitsPerComponent", 8)))
+    return data
+
+
+class _PdfReader:
+    """Just enough of a PDF reader to follow the cross-reference chain and read individual objects."""
+
+    def __init__(self, f):
+        self.f = f
+        self.size = os.fstat(f.fileno()).st_size
+        # object number -> (offset, generation), (None, object stream number, index), or None when free
+        self.xref = {}
+        self._object_streams = {}
+        self.startxref, self.trailer, self.uses_xref_stream = self._read_xref_chain()
+
+    def _read(self, offset, length):
+        self.f.seek(offset)
+        return self.f.read(length)
+
+    def _parse_at(self, offset, parse):
+        length = _CHUNK
+        while True:
+            try:
+                return parse(self._read(offset, length))
+            except PdfSyntaxError:
+                if offset + length >= self.size:
+                    raise
+                length *= 4
+
+    def _read_xref_chain(self):
+        tail = self._read(max(0, self.size - 1024), 1024)
+        starts = re.findall(rb"startxref\s+(\d+)", tail)
+        if not starts:
+            raise PdfSyntaxError("no startxref")
+        startxref = offset = int(starts[-1])
+        trailer = uses_xref_stream = None
+        seen = set()
+        while offset is not None and offset not in seen:
+            seen.add(offset)
+            section_trailer, is_stream = self._read_xref_section(offset)
+            if trailer is None:
+                trailer, uses_xref_stream = section_trailer, is_stream
+            if "XRefStm" in section_trailer:  # hybrid file: its stream entries come before the older sections
+                self._read_xref_section(int(section_trailer["XRefStm"]))
+            offset = int(section_trailer["Prev"]) if "Prev" in section_trailer else None
+        return startxref, trailer, uses_xref_stream
+
+    def _read_xref_section(self, offset):
+        if self._read(offset, 4) == b"xref":
+            return self._parse_at(offset, self._parse_xref_table), False
+        _, _, stream_dict, data = self.read_stream(offset)
+        if stream_dict.get("Type") != "XRef":
+            raise PdfSyntaxError(f"no cross-reference section at offset {offset}")
+        widths = [int(width) for width in stream_dict["W"]]
+        index = [int(i) for i in stream_dict.get("Index", [0, stream_dict["Size"]])]
+        pos = 0
+        for start, count in zip(index[::2], index[1::2]):
+            for num in range(start, start + count):
+                fields = []
+                for width in widths:
+                    fields.append(int.from_bytes(data[pos:pos + width], "big"))
+                    pos += width
+                kind = fields[0] if widths[0] else 1
+                self.xref.setdefault(num, (fields[1], fields[2]) if kind == 1 else
+                                     (None, fields[1], fields[2]) if kind == 2 else None)
+        return stream_dict, True
+
+    def _parse_xref_table(self, data):
+        trailer_pos = data.find(b"trailer")
+        if trailer_pos < 0:
+            raise PdfSyntaxError("cross-reference table has no trailer")
+        trailer, _ = parse_value(data, trailer_pos + len(b"trailer"))
+        tokens = data[4:trailer_pos].split()
+        i = 0
+        while i + 1 < len(tokens):
+            start, count = int(tokens[i]), int(tokens[i + 1])
+            i += 2
+            for num in range(start, start + count):
+                offset, gen, kind = tokens[i:i + 3]
+                i += 3
+                self.xref.setdefault(num, (int(offset), int(gen)) if kind == b"n" else None)
+        return trailer
+
+    def read_stream(self, offset):
+        num, gen, stream_dict, pos = self._parse_at(offset, _parse_indirect)
+        start = offset + pos
+        keyword = self._read(start, 8)
+        if not keyword.startswith(b"stream"):
+            raise PdfSyntaxError(f"object {num} is not a stream")
+        start += 6 + (2 if keyword[6:] == b"\r\n" else 1 if keyword[6:7] in (b"\r", b"\n") else 0)
+        length = int(self.resolve(stream_dict["Length"]))
+        return num, gen, stream_dict, _decode_stream(stream_dict, self._read(start, length))
+
+    def _object_stream(self, num):
+        objects = self._object_streams.get(num)
+        if objects is None:
+            _, _, stream_dict, data = self.read_stream(self.xref[num][0])
+            first = int(stream_dict["First"])
+            header = data[:first].split()
+            data += b" "  # the last object may be a bare number
+            objects = self._object_streams[num] = [parse_value(data, first + int(header[2 * i + 1]))[0]
+                                                   for i in range(int(stream_dict["N"]))]
+        return objects
+
+    def get(self, ref):
+        entry = self.xref.get(ref.num)
+        if entry is None:
+            return None
+        if entry[0] is not None:
+            return self._parse_at(entry[0], _parse_indirect)[2]
+        return self._object_stream(entry[1])[entry[2]]
+
+    def resolve(self, value):
+        return self.get(value) if isinstance(value, Ref) else value
+
+
+class TextField(NamedTuple):
+    ref: Ref
+    name: str  # fully qualified, e.g. "Child.First Name"
+    partial_name: str
+    value: dict  # the field dictionary as found in the template
+
+
+class TemplateFields(NamedTuple):
+    size: int
+    startxref: int
+    trailer: dict
+    uses_xref_stream: bool
+    root_ref: Ref
+    root: dict
+    acroform_ref: Optional[Ref]  # None when the AcroForm dictionary sits inline in the catalog
+    acroform: dict
+    fields: tuple
+
+
+def _decode_text(value):
+    if value.startswith(codecs.BOM_UTF16_BE):
+        return value[2:].decode("utf-16-be", "replace")
+    return value.decode("latin-1")
+
+
+def _encode_text(text):
+    try:
+        return text.encode("ascii")
+    except UnicodeEncodeError:
+        return codecs.BOM_UTF16_BE + text.encode("utf-16-be")
+
+
+def _text_fields(reader, acroform):
+    fields = []
+    seen = set()
+    stack = [(ref, "", None) for ref in reversed(reader.resolve(acroform.get("Fields")) or [])]
+    while stack:
+        ref, parent_name, inherited_type = stack.pop()
+        if not isinstance(ref, Ref) or ref in seen:
+            continue
+        seen.add(ref)
+        field = reader.get(ref)
+        if not isinstance(field, dict):
+            continue
+        partial = field.get("T")
+        name = parent_name
+        field_type = field.get("FT", inherited_type)
+        if isinstance(partial, bytes) and not isinstance(partial, Token):
+            partial = _decode_text(partial)
+            name = f"{parent_name}.{partial}" if parent_name else partial
+            if field_type == "Tx":
+                fields.append(TextField(ref, name, partial, field))
+        stack.extend((kid, name, field_type) for kid in reversed(reader.resolve(field.get("Kids")) or []))
+    return tuple(fields)
+
+
+@functools.lru_cache(maxsize=64)
+def _template_fields(template_path, version):
+    with TRACER.span("pdf_field_scan"), open(template_path, "rb") as f:
+        try:
+            reader = _PdfReader(f)
+            if "Encrypt" in reader.trailer:
+                return None
+            root_ref = reader.trailer["Root"]
+            root = reader.get(root_ref)
+            acroform_ref = root.get("AcroForm")
+            if not isinstance(acroform_ref, Ref):
+                acroform_ref, acroform = None, acroform_ref
+            else:
+                acroform = reader.get(acroform_ref)
+            if not isinstance(acroform, dict):
+                return None
+            return TemplateFields(reader.size, reader.startxref, reader.trailer, reader.uses_xref_stream,
+                                  root_ref, root, acroform_ref, acroform, _text_fields(reader, acroform))
+        except (PdfSyntaxError, KeyError, IndexError, TypeError, AttributeError, ValueError, zlib.error) as e:
+            print(f"Could not read form fields of '{template_path}': {e}")
+            return None
+
+
+def template_fields(template_path) -> Optional[TemplateFields]:
+    """The text fields of a PDF template, or None when it has no usable AcroForm. Parsed once per version."""
+    template_path = os.fspath(template_path)
+    return _template_fields(template_path, template_version(template_path))
+
+
+def _subsections(refs):
+    groups = []
+    for ref in refs:
+        if groups and ref.num == groups[-1][-1].num + 1:
+            groups[-1].append(ref)
+        else:
+            groups.append([ref])
+    return groups
+
+
+def _incremental_update(table, updates):
+    out = bytearray(b"\n")
+    offsets = {}
+    for ref, value in sorted(updates.items()):
+        offsets[ref] = table.size + len(out)
+        out += b"%d %d obj\n%s\nendobj\n" % (ref.num, ref.gen, serialize(value))
+    trailer = {key: table.trailer[key] for key in ("Root", "Info", "ID") if key in table.trailer}
+    trailer["Prev"] = table.startxref
+    xref_offset = table.size + len(out)
+    if table.uses_xref_stream:
+        # The update's cross-reference data must be a stream too; it is the only new object.
+        xref_ref = Ref(int(table.trailer["Size"]), 0)
+        offsets[xref_ref] = xref_offset
+        offset_width = max(4, (xref_offset.bit_length() + 7) // 8)
+        refs = sorted(offsets)
+        data = b"".join(b"\x01" + offsets[ref].to_bytes(offset_width, "big") + ref.gen.to_bytes(2, "big")
+                        for ref in refs)
+        trailer.update(Type=Name("XRef"), Size=xref_ref.num + 1, W=[1, offset_width, 2], Length=len(data),
+                       Index=[n for group in _subsections(refs) for n in (group[0].num, len(group))])
+        out += b"%d 0 obj\n%s\nstream\r\n%s\r\nendstream\nendobj\n" % (xref_ref.num, serialize(trailer), data)
+    else:
+        trailer["Size"] = table.trailer["Size"]
+        out += b"xref\n0 1\n0000000000 65535 f\r\n"  # the free-list head, which some readers expect first
+        for group in _subsections(sorted(offsets)):
+            out += b"%d %d\n" % (group[0].num, len(group))
+            out += b"".join(b"%010d %05d n\r\n" % (offsets[ref], ref.gen) for ref in group)
+        out += b"trailer\n%s\n" % serialize(trailer)
+    out += b"startxref\n%d\n%%%%EOF\n" % xref_offset
+    return bytes(out)
+
+
+def prefill_pdf(template_path, pdf_path, values):
+    """Fill the text fields of `pdf_path`, an unmodified copy of `template_path`, whose fully qualified or partial
+    name matches a key of `values` (case-insensitively). Returns the number of bytes appended: 0 when no field
+    matched or the template has no usable AcroForm.
+    """
+    table = template_fields(template_path)
+    if table is None:
+        return 0
+    values = {name.lower(): text for name, text in values.items()}
+    updates = {}
+    for field in table.fields:
+        text = values.get(field.name.lower(), values.get(field.partial_name.lower()))
+        if text is None:
+            continue
+        filled = dict(field.value)
+        filled[Name("V")] = _encode_text(text)
+        if filled.get("Subtype") == "Widget":
+            filled.pop("AP", None)  # the field is its own widget: drop the blank appearance so it is redrawn
+        updates[field.ref] = filled
+    if not updates:
+        return 0
+    acroform = dict(table.acroform)
+    acroform[Name("NeedAppearances")] = True
+    if table.acroform_ref is not None:
+        updates[table.acroform_ref] = acroform
+    else:
+        root = dict(table.root)
+        root[Name("AcroForm")] = acroform
+        updates[table.root_ref] = root
+
+    with TRACER.span("pdf_prefill", fields=len(updates)), open(pdf_path, "r+b") as f:
+        if os.fstat(f.fileno()).st_size != table.size:
+            raise ValueError(f"'{pdf_path}' is not an unmodified copy of '{template_path}'")
+        update = _incremental_update(table, updates)
+        f.seek(table.size)
+        try:
+            f.write(update)
+        except OSError:
+            f.truncate(table.size)
+            raise
+    return len(update)
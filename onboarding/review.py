@@ -0,0 +1,277 @@
+"""Office review of Filled_Forms: which forms a family is missing, and who onboarded in a given week.
+
+Copy names are parsed once into an index kept next to the copies, covering both the flat directory and the
+sessions archived by compaction. Each run only re-reads what changed since the last one:
+
+    python -m onboarding.review --family "Jane Doe" [--user-type Parent]
+    python -m onboarding.review --week [--since 2026-09-07]
+    python -m onboarding.review --family "Jane Doe" --filled-forms-dir /path/to/Filled_Forms
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+from onboarding.catalog import scan_forms
+from onboarding.compaction import ARCHIVE_DIRNAME, MANIFEST_FILENAME
+from onboarding.config import FILLED_FORMS_SUBDIR, forms_dir_for_user_type, get_config
+from onboarding.file_lock import FileLock
+from onboarding.forms_core import copied_form_base, make_safe_user_name, parse_copied_form_name
+
+# In a folder of its own: writing the index then never changes the mtime of Filled_Forms, which is how refresh()
+# notices new copies.
+REVIEW_INDEX_DIRNAME = ".review_index"
+REVIEW_INDEX_FILENAME = "index.sqlite3"
+REVIEW_INDEX_LOCK_FILENAME = "index.lock"
+USER_TYPES = ("Parent", "Staff")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS forms (
+    name TEXT NOT NULL,
+    archived INTEGER NOT NULL,
+    base TEXT NOT NULL,
+    user_type TEXT NOT NULL,
+    safe_user_name TEXT NOT NULL COLLATE NOCASE,
+    taken_at TEXT NOT NULL,
+    PRIMARY KEY (name, archived)
+);
+CREATE INDEX IF NOT EXISTS forms_by_family ON forms (user_type, safe_user_name, taken_at);
+CREATE INDEX IF NOT EXISTS forms_by_time ON forms (taken_at);
+CREATE TABLE IF NOT EXISTS sources (
+    archived INTEGER PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+"""
+
+
+class FiledForm(NamedTuple):
+    name: str
+    archived: bool
+    base: str
+    user_type: str
+    safe_user_name: str
+    taken_at: datetime
+
+
+class FamilySummary(NamedTuple):
+    user_type: str
+    safe_user_name: str
+    first_at: datetime
+    last_at: datetime
+    bases: frozenset  # bases (see copied_form_base) of every form on file
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+class ReviewIndex:
+    """SQLite index of the parsed names of every copy in a Filled_Forms directory and its archive.
+
+    `refresh()` compares the directory's and the archive manifest's mtimes with those seen last time and only
+    lists what changed, diffing names against the index so each name is parsed once. Unchanged sources cost a
+    stat each, so queries stay instant however many years of copies the directory holds. Names that are not
+    copies (see parse_copied_form_name), dot files and sub-directories are ignored.
+    """
+
+    def __init__(self, filled_forms_dir):
+        # Absolute, as the manifest is opened through a file: URI.
+        self.filled_forms_dir = Path(filled_forms_dir).resolve()
+        index_dir = self.filled_forms_dir / REVIEW_INDEX_DIRNAME
+        index_dir.mkdir(exist_ok=True)
+        self.path = index_dir / REVIEW_INDEX_FILENAME
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(index_dir / REVIEW_INDEX_LOCK_FILENAME)
+        with self._file_lock:
+            self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+
+    def refresh(self, force=False):
+        """Bring the index up to date; returns (added, removed) name counts."""
+        added = removed = 0
+        with self._file_lock:
+            for archived, path, list_names in (
+                    (False, self.filled_forms_dir, self._flat_names),
+                    (True, self.filled_forms_dir / ARCHIVE_DIRNAME / MANIFEST_FILENAME, self._archived_names)):
+                # Taken before listing: a change made while listing shows up as a new signature next time.
+                signature = _signature(path)
+                with self._lock:
+                    row = self._conn.execute("SELECT signature FROM sources WHERE archived = ?",
+                                             (archived,)).fetchone()
+                if not force and row is not None and row[0] == signature:
+                    continue
+                names = list_names() if signature != "missing" else set()
+                source_added, source_removed = self._apply(archived, names, signature)
+                added += source_added
+                removed += source_removed
+        return added, removed
+
+    def _flat_names(self):
+        with os.scandir(self.filled_forms_dir) as entries:
+            return {entry.name for entry in entries if not entry.name.startswith(".") and entry.is_file()}
+
+    def _archived_names(self):
+        manifest_uri = (self.filled_forms_dir / ARCHIVE_DIRNAME / MANIFEST_FILENAME).as_uri() + "?mode=ro"
+        conn = sqlite3.connect(manifest_uri, uri=True, timeout=30)
+        try:
+            return {row[0] for row in conn.execute("SELECT name FROM entries")}
+        except sqlite3.OperationalError:  # manifest created but its table not yet
+            return set()
+        finally:
+            conn.close()
+
+    def _apply(self, archived, names, signature):
+        with self._lock:
+            known = {row[0] for row in self._conn.execute("SELECT name FROM forms WHERE archived = ?", (archived,))}
+        gone = known - names
+        rows = []
+        for name in names - known:
+            parsed = parse_copied_form_name(name)
+            if parsed is not None:
+                rows.append((name, archived, parsed.base, parsed.user_type, parsed.safe_user_name,
+                             parsed.timestamp.isoformat()))
+        rows.sort()  # inserting in key order keeps a first build of a large directory several times faster
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM forms WHERE name = ? AND archived = ?",
+                                   ((name, archived) for name in gone))
+            self._conn.executemany("INSERT OR REPLACE INTO forms VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?)", (archived, signature))
+        return len(rows), len(gone)
+
+    def family_forms(self, user_type, user_name):
+        """Forms on file for `user_name` (matched like copy names, ignoring case), oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, archived, base, user_type, safe_user_name, taken_at FROM forms "
+                "WHERE user_type = ? AND safe_user_name = ? ORDER BY taken_at",
+                (user_type, make_safe_user_name(user_name))).fetchall()
+        return [FiledForm(name, bool(archived), base, user_type, safe_user_name, datetime.fromisoformat(taken_at))
+                for name, archived, base, user_type, safe_user_name, taken_at in rows]
+
+    def families_since(self, since, user_type=None):
+        """Families whose first form on file was made at or after `since`, in the order they started."""
+        # Only forms made since `since` are read (without INDEXED BY, SQLite prefers walking forms_by_family for
+        # the GROUP BY), and for each one forms_by_family tells whether the family has an earlier form, so the
+        # cost follows the number of recent forms rather than the years on file.
+        where, params = "f.taken_at >= ?", [since.isoformat()]
+        if user_type is not None:
+            where, params = where + " AND f.user_type = ?", params + [user_type]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT f.user_type, f.safe_user_name, MIN(f.taken_at), MAX(f.taken_at), "
+                "GROUP_CONCAT(f.base, char(10)) FROM forms f INDEXED BY forms_by_time "
+                f"WHERE {where} AND NOT EXISTS (SELECT 1 FROM forms e WHERE e.user_type = f.user_type "
+                "AND e.safe_user_name = f.safe_user_name AND e.taken_at < ?) "
+                "GROUP BY f.user_type, f.safe_user_name ORDER BY MIN(f.taken_at)",
+                params + [since.isoformat()]).fetchall()
+        return [FamilySummary(user_type, safe_user_name, datetime.fromisoformat(first_at),
+                              datetime.fromisoformat(last_at), frozenset(bases.split("\n")))
+                for user_type, safe_user_name, first_at, last_at, bases in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM forms").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def required_forms(forms_dir):
+    """{base: form name} for every template in `forms_dir`, i.e. what each family is expected to fill."""
+    return {copied_form_base(form_name): form_name
+            for form_name, _ in scan_forms(forms_dir, get_config().scan_subfolders)}
+
+
+def missing_forms(required, bases_on_file):
+    """Names of the `required` forms (see required_forms) with no copy among `bases_on_file`."""
+    on_file = {base.casefold() for base in bases_on_file}
+    return sorted((form_name for base, form_name in required.items() if base.casefold() not in on_file),
+                  key=str.lower)
+
+
+def start_of_week(day=None):
+    day = day or datetime.now()
+    return datetime(day.year, day.month, day.day) - timedelta(days=day.weekday())
+
+
+def _report_family(index, required, user_type, user_name):
+    forms = index.family_forms(user_type, user_name)
+    missing = missing_forms(required, (form.base for form in forms))
+    if not forms:
+        print(f"{user_type} '{user_name}': no forms on file ({len(required)} required)")
+        return
+    print(f"{user_type} '{user_name}': {len(required) - len(missing)} of {len(required)} required forms on file, "
+          f"last activity {forms[-1].taken_at:%Y-%m-%d %H:%M}")
+    for form_name in missing:
+        print(f"  missing: {form_name}")
+    for form in forms:
+        print(f"  {form.taken_at:%Y-%m-%d %H:%M}  {form.name}{'  (archived)' if form.archived else ''}")
+
+
+def _report_week(index, required, user_type, since):
+    for family in index.families_since(since, user_type):
+        missing = missing_forms(required, family.bases)
+        status = f"{len(missing)} missing" if missing else "complete"
+        print(f"  {family.first_at:%Y-%m-%d %H:%M}  {family.user_type:<6} {family.safe_user_name:<30} "
+              f"{len(family.bases)} forms, {status}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="onboarding.review", description=__doc__.splitlines()[0])
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument("--family", metavar="NAME", help="list the forms on file and missing for this person")
+    query.add_argument("--week", action="store_true", help="list families who started since --since")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None,
+                        help="YYYY-MM-DD (default: Monday of this week)")
+    parser.add_argument("--user-type", choices=USER_TYPES, default=None, help="default: both")
+    parser.add_argument("--filled-forms-dir", type=Path, default=None,
+                        help="review this directory instead of the configured ones; its parent holds the templates")
+    parser.add_argument("--rescan", action="store_true", help="re-list every source even if unchanged")
+    args = parser.parse_args(argv)
+
+    since = args.since or start_of_week()
+    if args.week:
+        print(f"Families who started on or after {since:%Y-%m-%d}:")
+    indexes = {}
+    try:
+        for user_type in ([args.user_type] if args.user_type else USER_TYPES):
+            if args.filled_forms_dir is not None:
+                filled_forms_dir = args.filled_forms_dir
+            else:
+                filled_forms_dir = forms_dir_for_user_type(user_type) / FILLED_FORMS_SUBDIR
+            if not filled_forms_dir.is_dir():
+                print(f"No {FILLED_FORMS_SUBDIR} directory for {user_type}: {filled_forms_dir}", file=sys.stderr)
+                continue
+            index = indexes.get(filled_forms_dir)
+            if index is None:
+                start = time.perf_counter()
+                index = indexes[filled_forms_dir] = ReviewIndex(filled_forms_dir)
+                added, removed = index.refresh(force=args.rescan)
+                print(f"Index of {filled_forms_dir}: {len(index)} forms (+{added} -{removed}, "
+                      f"{(time.perf_counter() - start) * 1000:.0f} ms)", file=sys.stderr)
+            required = required_forms(filled_forms_dir.parent)
+            if args.family:
+                _report_family(index, required, user_type, args.family)
+            else:
+                _report_week(index, required, user_type, since)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Could not review forms: {e}", file=sys.stderr)
+        return 1
+    finally:
+        for index in indexes.values():
+            index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
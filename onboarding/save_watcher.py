@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+
+from onboarding.fs_watch import IN_CLOSE_WRITE, IN_MOVED_TO, InotifyWatcher
+
+QUICK_HASH_BLOCK = 64 * 1024
+
+
+def quick_hash(path):
+    """Hash of the size plus the first and last 64 KiB of a file.
+
+    Saving a PDF (full rewrite or incremental update, which appends) or a DOCX (zip central directory at the end)
+    always changes the tail, so this detects saves without reading whole scanned packets.
+    """
+    sha = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        sha.update(size.to_bytes(8, "little"))
+        sha.update(f.read(QUICK_HASH_BLOCK))
+        if size > QUICK_HASH_BLOCK:
+            f.seek(max(QUICK_HASH_BLOCK, size - QUICK_HASH_BLOCK))
+            sha.update(f.read(QUICK_HASH_BLOCK))
+    return sha.hexdigest()
+
+
+class _TrackedCopy:
+    __slots__ = ("key", "path", "baseline_hash", "stat_key")
+
+    def __init__(self, key, path, baseline_hash):
+        self.key = key
+        self.path = path
+        self.baseline_hash = baseline_hash
+        self.stat_key = None
+
+
+class SaveWatcher:
+    """Reports when a tracked form copy has really been saved, i.e. no longer matches its hash as it was handed out
+    (`baseline_hash`, see quick_hash). Copies recorded without one are compared with how they were when first
+    checked, never with their template, which may have been replaced since.
+
+    Copies are checked on a background thread only: on inotify close-write/rename events where available, and by
+    a periodic pass that stats every tracked copy (and hashes only those whose size or mtime moved). Each copy is
+    reported once through `on_saved(key, path)`, called from the background thread.
+    """
+
+    def __init__(self, on_saved, poll_interval=None, use_inotify=True):
+        self.on_saved = on_saved
+        self._lock = threading.Lock()
+        self._tracked = {}
+        self._inotify = InotifyWatcher.create(self._on_watch_event, IN_CLOSE_WRITE | IN_MOVED_TO) \
+            if use_inotify else None
+        # With inotify the poll is only a safety net for changes it cannot see (e.g. other SMB clients).
+        self.poll_interval = poll_interval or (15.0 if self._inotify else 2.0)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="save-watcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def mode(self):
+        return f"inotify + {self.poll_interval:g}s poll" if self._inotify else f"{self.poll_interval:g}s poll"
+
+    def track(self, key, copied_path, baseline_hash=None):
+        """Start watching `copied_path`. Hashing happens on the watcher thread, not the caller's."""
+        copied_path = os.fspath(copied_path)
+        with self._lock:
+            self._tracked[copied_path] = _TrackedCopy(key, copied_path, baseline_hash)
+        if self._inotify:
+            self._inotify.watch(os.path.dirname(copied_path))
+        self._wake.set()
+
+    def untrack(self, copied_path):
+        with self._lock:
+            self._tracked.pop(os.fspath(copied_path), None)
+
+    def untrack_all(self):
+        with self._lock:
+            self._tracked.clear()
+
+    def tracked_count(self):
+        with self._lock:
+            return len(self._tracked)
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        if self._inotify:
+            self._inotify.close()
+
+    def _on_watch_event(self, directory, name, mask):
+        with self._lock:
+            tracked = self._tracked.get(os.path.join(directory, name)) if name else None
+            if name and tracked is None:
+                return
+            if tracked is not None:
+                tracked.stat_key = None  # force a hash check even if size and mtime look unchanged
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            self._check_all()
+
+    def check_now(self, copied_path):
+        """Check `copied_path` on the caller's thread, reporting it through on_saved if it was saved.
+
+        Returns False while the copy is tracked and unsaved, True otherwise (including copies already reported).
+        """
+        with self._lock:
+            copy = self._tracked.get(os.fspath(copied_path))
+            if copy is None:
+                return True
+            copy.stat_key = None
+        return self._check(copy)
+
+    def _check_all(self):
+        with self._lock:
+            tracked = list(self._tracked.values())
+        for copy in tracked:
+            self._check(copy)
+
+    def _check(self, copy):
+        try:
+            if copy.baseline_hash is None:
+                copy.baseline_hash = quick_hash(copy.path)
+            st = os.stat(copy.path)
+            stat_key = (st.st_size, st.st_mtime_ns)
+            if stat_key == copy.stat_key:
+                return False
+            copy.stat_key = stat_key
+            if quick_hash(copy.path) == copy.baseline_hash:
+                return False
+        except OSError:
+            return False
+        with self._lock:
+            if self._tracked.get(copy.path) is not copy:
+                return True
+            del self._tracked[copy.path]
+        self.on_saved(copy.key, copy.path)
+        return True
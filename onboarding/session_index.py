@@ -0,0 +1,173 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from onboarding.file_lock import FileLock
+
+SESSION_INDEX_FILENAME = ".session_index.sqlite3"
+SESSION_INDEX_LOCK_FILENAME = ".session_index.lock"
+
+STATE_CREATED = "created"
+STATE_OPENED = "opened"
+STATE_SAVED = "saved"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS copies (
+    user_type TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    template TEXT NOT NULL,
+    template_version TEXT NOT NULL,
+    copied_name TEXT NOT NULL,
+    state TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    baseline_hash TEXT,
+    template_fingerprint TEXT,
+    PRIMARY KEY (user_type, user_name, template, template_version)
+);
+CREATE INDEX IF NOT EXISTS copies_by_user ON copies (user_type, user_name);
+CREATE INDEX IF NOT EXISTS copies_by_name ON copies (copied_name);
+CREATE TABLE IF NOT EXISTS kiosk_sequences (
+    kiosk_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL
+);
+"""
+
+
+def template_version(template_path):
+    st = os.stat(template_path)
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+class CopyRecord(NamedTuple):
+    user_type: str
+    user_name: str
+    template: str
+    template_version: str
+    copied_path: Path
+    state: str
+    created_at: str
+    updated_at: str
+    baseline_hash: Optional[str] = None  # quick_hash of the copy as handed out
+    template_fingerprint: Optional[str] = None  # sha256 of the template content the copy was made from
+
+
+class SessionIndex:
+    """SQLite index in a Filled_Forms directory mapping (user_type, user, template, template version) to the
+    copy made for it and its state, so reopening and resuming a session never rescans the directory.
+
+    Copies are stored by file name so the index stays valid when kiosks mount the share at different paths.
+    Several kiosks share one index, so every write also holds an advisory lock on a sibling lock file: SQLite's
+    own locking is not reliable over SMB.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, filled_forms_dir):
+        self.filled_forms_dir = Path(filled_forms_dir)
+        self.path = self.filled_forms_dir / SESSION_INDEX_FILENAME
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(self.filled_forms_dir / SESSION_INDEX_LOCK_FILENAME)
+        with self._file_lock:
+            self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(copies)")}
+            for column in ("baseline_hash", "template_fingerprint"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE copies ADD COLUMN {column} TEXT")
+
+    @classmethod
+    def for_directory(cls, filled_forms_dir):
+        filled_forms_dir = Path(filled_forms_dir)
+        with cls._instances_lock:
+            index = cls._instances.get(filled_forms_dir)
+            if index is None:
+                filled_forms_dir.mkdir(parents=True, exist_ok=True)
+                index = cls._instances[filled_forms_dir] = cls(filled_forms_dir)
+            return index
+
+    def _to_record(self, row):
+        if row is None:
+            return None
+        return CopyRecord(row[0], row[1], row[2], row[3], self.filled_forms_dir / row[4], *row[5:])
+
+    def lookup(self, user_type, user_name, template, version) -> Optional[CopyRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT user_type, user_name, template, template_version, copied_name, state, created_at, updated_at, "
+                "baseline_hash, template_fingerprint "
+                "FROM copies WHERE user_type = ? AND user_name = ? AND template = ? AND template_version = ?",
+                (user_type, user_name, template, version)).fetchone()
+        return self._to_record(row)
+
+    def copies_for_user(self, user_type, user_name):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_type, user_name, template, template_version, copied_name, state, created_at, updated_at, "
+                "baseline_hash, template_fingerprint "
+                "FROM copies WHERE user_type = ? AND user_name = ? ORDER BY created_at",
+                (user_type, user_name)).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def record(self, user_type, user_name, template, version, copied_path, state=STATE_CREATED, baseline_hash=None,
+               template_fingerprint=None):
+        with self._file_lock:
+            self._record(user_type, user_name, template, version, copied_path, state, baseline_hash,
+                         template_fingerprint)
+
+    def _record(self, user_type, user_name, template, version, copied_path, state, baseline_hash,
+                template_fingerprint):
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO copies (user_type, user_name, template, template_version, copied_name, state, "
+                "created_at, updated_at, baseline_hash, template_fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (user_type, user_name, template, template_version) DO UPDATE SET "
+                "copied_name = excluded.copied_name, state = excluded.state, updated_at = excluded.updated_at, "
+                "baseline_hash = excluded.baseline_hash, template_fingerprint = excluded.template_fingerprint",
+                (user_type, user_name, template, version, Path(copied_path).name, state, now, now, baseline_hash,
+                 template_fingerprint))
+
+    def claim(self, user_type, user_name, template, version, copied_path, baseline_hash=None,
+              template_fingerprint=None) -> Optional[CopyRecord]:
+        """Record `copied_path` unless another kiosk recorded a copy that still exists in the meantime.
+
+        Returns that other copy's record when it won the race, or None when `copied_path` was recorded.
+        """
+        with self._file_lock:
+            existing = self.lookup(user_type, user_name, template, version)
+            if existing is not None and existing.copied_path != Path(copied_path) and existing.copied_path.exists():
+                return existing
+            self._record(user_type, user_name, template, version, copied_path, STATE_CREATED, baseline_hash,
+                         template_fingerprint)
+        return None
+
+    def set_state(self, user_type, user_name, template, version, state):
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._file_lock, self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE copies SET state = ?, updated_at = ? "
+                "WHERE user_type = ? AND user_name = ? AND template = ? AND template_version = ?",
+                (state, now, user_type, user_name, template, version))
+
+    def set_state_for_copy(self, copied_path, state):
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._file_lock, self._lock, self._conn:
+            self._conn.execute("UPDATE copies SET state = ?, updated_at = ? WHERE copied_name = ?",
+                               (state, now, Path(copied_path).name))
+
+    def next_sequence(self, kiosk_id):
+        """Return the next number of `kiosk_id`'s monotonic sequence, shared by all its processes."""
+        with self._file_lock, self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO kiosk_sequences VALUES (?, 1) ON CONFLICT (kiosk_id) DO UPDATE SET seq = seq + 1",
+                (kiosk_id,))
+            return self._conn.execute("SELECT seq FROM kiosk_sequences WHERE kiosk_id = ?", (kiosk_id,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
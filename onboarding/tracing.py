@@ -0,0 +1,123 @@
+import json
+import socket
+import threading
+import time
+from collections import deque
+
+
+class LatencyHistogram:
+    """Latencies of the last `size` calls of one operation (a ring buffer), summarised as p50/p95/max."""
+
+    def __init__(self, size=256):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": self.count,
+            "p50_ms": ordered[len(ordered) // 2] * 1000,
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            "max_ms": ordered[-1] * 1000,
+        }
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "start")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+
+    def end(self, **attrs):
+        if self.start is not None:
+            self.attrs.update(attrs)
+            self.tracer.record(self.name, time.perf_counter() - self.start, self.attrs)
+            self.start = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.end(error=exc_type.__name__)
+        else:
+            self.end()
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def end(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Collects spans into per-operation histograms and, optionally, a JSON-lines file.
+
+    While disabled `span()` hands back a shared no-op object, so instrumented code costs one attribute check.
+    """
+
+    def __init__(self, histogram_size=256):
+        self.enabled = False
+        self.histogram_size = histogram_size
+        self.host = socket.gethostname()
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._export_file = None
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def record(self, name, seconds, attrs=None):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(self.histogram_size)
+            histogram.add(seconds)
+            if self._export_file is not None:
+                event = {"ts": time.time(), "host": self.host, "op": name, "ms": round(seconds * 1000, 3)}
+                if attrs:
+                    event.update(attrs)
+                self._export_file.write(json.dumps(event, default=str) + "\n")
+                self._export_file.flush()
+
+    def summaries(self):
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+
+    def export_to(self, path):
+        """Append every finished span to `path` as one JSON object per line (None stops exporting)."""
+        with self._lock:
+            if self._export_file is not None:
+                self._export_file.close()
+            self._export_file = open(path, "a", encoding="utf-8") if path else None
+        if path:
+            self.enabled = True
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+TRACER = Tracer()